@@ -0,0 +1,334 @@
+"""
+Local stand-ins for every service the pipeline talks to, on one HTTP server.
+
+    /rss/<n>.xml                    RSS feed, FEED_SIZE items (some repeat HN stories)
+    /hn/topstories.json             fake HN firebase API (HN_API_URL=<base>/hn)
+    /hn/item/<id>.json
+    /reddit/r/<sub>/top.json        fake Reddit listing (REDDIT_API_URL=<base>/reddit)
+    /arxiv/query                    fake arXiv Atom feed
+    /page/<id>                      article page whose <head> carries og:image
+    .../chat/completions            OpenAI-compatible chat endpoint (Groq and OpenRouter)
+    /image-search?q=                {"image": url}, for IMAGE_SEARCH_URL
+    /images/<name>.png              generated PNG
+    /tts?voice=&text=               silent MP3 sized to the text
+    /proxy/<url>                    record real responses to, or replay them from, a fixtures dir
+
+Content is generated from a seed, so a given configuration serves the same
+data on every run. Chat latency and the share of 429 responses are
+configurable to exercise the retry paths.
+"""
+import hashlib
+import json
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+import mp3  # noqa: E402
+
+# Items per RSS feed; the scraper reads the first 5
+FEED_SIZE = 5
+
+HN_TOP_STORIES = 500
+
+SUBREDDITS = ('LocalLLaMA', 'ArtificialIntelligence', 'MachineLearning')
+
+TOPICS = ['LLM', 'transformer', 'GPT', 'diffusion model', 'neural network', 'machine learning',
+          'reinforcement learning', 'AI agent', 'fine-tuning', 'open-source model', 'inference chip',
+          'embedding', 'multimodal model', 'Claude', 'Gemini', 'Llama']
+OTHER_TOPICS = ['database', 'compiler', 'web framework', 'keyboard', 'bicycle', 'startup',
+                'rust crate', 'spreadsheet', 'telescope', 'operating system']
+VERBS = ['beats', 'scales', 'explains', 'ships', 'cuts the cost of', 'rethinks', 'benchmarks', 'speeds up']
+OBJECTS = ['code review', 'protein folding', 'search ranking', 'weather forecasts', 'chip design',
+           'translation', 'robotics', 'medical imaging', 'long documents', 'on-device inference']
+
+# One MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono frame header
+MP3_HEADER = mp3.parse_header(bytes([0xFF, 0xFB, 0x90, 0xC4]))
+
+class Config:
+    def __init__(self, seed=0, chat_latency=0.05, error_rate=0.0, fixtures=None, record=False):
+        self.seed = seed
+        self.chat_latency = chat_latency   # seconds per chat completion
+        self.error_rate = error_rate       # share of chat requests answered with 429
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.record = record
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, route):
+        with self.lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+
+    def inject_error(self):
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+def _rng(*parts):
+    """Random source for one generated item, stable across runs"""
+    return random.Random(hashlib.sha256(repr(parts).encode()).digest())
+
+SYLLABLES = ['ka', 'ro', 'vex', 'lin', 'tor', 'mi', 'qua', 'zen', 'dra', 'po', 'sel', 'nu', 'fi', 'gar']
+
+def name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+def headline(seed, n, relevant=True):
+    # Made-up names keep unrelated headlines from looking like near-duplicates to dedupe
+    rng = _rng('headline', seed, n)
+    topic = rng.choice(TOPICS if relevant else OTHER_TOPICS)
+    return f"{name(rng)} {topic} {rng.choice(VERBS)} {rng.choice(OBJECTS)}, {name(rng)} reports"
+
+def paragraph(seed, n, sentences=3):
+    rng = _rng('paragraph', seed, n)
+    return ' '.join(
+        f"The {rng.choice(TOPICS)} work {rng.choice(VERBS)} {rng.choice(OBJECTS)} by {rng.randint(2, 90)} percent."
+        for _ in range(sentences)
+    )
+
+def published(seed, n, now):
+    """A timestamp within the last two days"""
+    return int(now - _rng('published', seed, n).uniform(0, 48 * 3600))
+
+def hn_story(seed, sid, base, now):
+    # About a third of the top stories are AI related, as on the real front page
+    relevant = sid % 3 == 0
+    rng = _rng('hn', seed, sid)
+    return {
+        'id': sid, 'type': 'story', 'by': f"user{sid % 97}",
+        'title': headline(seed, sid, relevant),
+        'url': f"{base}/page/{sid}",
+        'time': published(seed, sid, now),
+        'score': rng.randint(5, 900), 'descendants': rng.randint(0, 400),
+    }
+
+def rss_feed(seed, feed, base, now):
+    items = []
+    for i in range(FEED_SIZE):
+        n = 100000 + feed * FEED_SIZE + i
+        # Every seventh item is a story HN also carries, to give dedupe something to merge
+        if n % 7 == 0:
+            sid = 1000 + (n % HN_TOP_STORIES) // 3 * 3
+            title, link = headline(seed, sid), f"{base}/page/{sid}"
+        else:
+            title, link = headline(seed, n), f"{base}/page/{n}"
+        items.append(
+            f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+            f"<pubDate>{formatdate(published(seed, n, now), usegmt=True)}</pubDate>"
+            f"<description>&lt;p&gt;{paragraph(seed, n)}&lt;/p&gt;</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Bench Feed {feed}</title><link>{base}/</link><description>Synthetic feed</description>"
+        + ''.join(items) + '</channel></rss>'
+    )
+
+def reddit_listing(seed, sub, limit, base, now):
+    children = []
+    for i in range(limit):
+        n = 200000 + SUBREDDITS.index(sub) * 100 + i if sub in SUBREDDITS else 300000 + i
+        rng = _rng('reddit', seed, n)
+        link_post = i % 2 == 0
+        children.append({'kind': 't3', 'data': {
+            'title': headline(seed, n), 'permalink': f"/r/{sub}/comments/{n}/post/",
+            'created_utc': float(published(seed, n, now)), 'stickied': i == 0,
+            'score': rng.randint(10, 3000), 'num_comments': rng.randint(0, 500),
+            'is_self': not link_post, 'url': f"{base}/page/{n}" if link_post else '',
+            'selftext': '' if link_post else paragraph(seed, n),
+            'thumbnail': f"{base}/images/thumb-{n}.png",
+        }})
+    return {'kind': 'Listing', 'data': {'children': children}}
+
+def arxiv_feed(seed, limit, now):
+    entries = []
+    for i in range(limit):
+        n = 400000 + i
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(published(seed, n, now)))
+        entries.append(
+            f"<entry><id>http://arxiv.org/abs/2501.{n:05d}v1</id><published>{stamp}</published>"
+            f"<title>{headline(seed, n)}</title><summary>{paragraph(seed, n, 5)}</summary>"
+            f'<link href="http://arxiv.org/abs/2501.{n:05d}v1" rel="alternate" type="text/html"/></entry>'
+        )
+    return ('<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            '<title>arXiv Query</title>' + ''.join(entries) + '</feed>')
+
+def article_page(n, base):
+    return (f'<!DOCTYPE html><html><head><title>Story {n}</title>'
+            f'<meta property="og:image" content="{base}/images/og-{n}.png">'
+            f'</head><body>{"<p>Story body.</p>" * 200}</body></html>')
+
+def png(name, width=96, height=54):
+    """A solid-colour PNG whose colour is derived from name"""
+    r, g, b = hashlib.sha256(name.encode()).digest()[:3]
+    row = b'\x00' + bytes([r, g, b]) * width
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * height))
+            + chunk(b'IEND', b''))
+
+def silent_mp3(text):
+    """Silence lasting roughly as long as text would take to read aloud"""
+    seconds = max(1.0, len(text) / 15)
+    frame = mp3.silence_frame(MP3_HEADER)
+    return frame * int(seconds / MP3_HEADER.duration)
+
+_BATCH_ID = re.compile(r'^\[(\w+)\]$', re.M)
+
+def chat_reply(request):
+    """Content for an OpenAI-style chat request, shaped like the pipeline's prompts expect"""
+    messages = request.get('messages', [])
+    prompt = '\n'.join(str(m.get('content', '')) for m in messages)
+    if (request.get('response_format') or {}).get('type') == 'json_object':
+        return json.dumps({'summaries': [
+            {'id': entry_id, 'summary': f"Synthetic summary for article {entry_id}. {paragraph('summary', entry_id, 2)}"}
+            for entry_id in _BATCH_ID.findall(prompt)
+        ]})
+    if 'ALEX:' in prompt:
+        lines = []
+        for i in range(8):
+            speaker = 'ALEX' if i % 2 == 0 else 'JORDAN'
+            lines.append(f"{speaker}: {paragraph('podcast', i, 2)}")
+        return '\n'.join(lines)
+    return f"Synthetic summary. {paragraph('single', len(prompt), 2)}"
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = None  # set by serve()
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def base(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def send(self, body, content_type='application/json', status=200, headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path, query = parsed.path, parse_qs(parsed.query)
+        config, now = self.config, time.time()
+        route = path.split('/')[1] if '/' in path else path
+        config.count(route)
+
+        if path.startswith('/proxy/'):
+            return self.proxy(self.path[len('/proxy/'):])
+        if m := re.fullmatch(r'/rss/(\d+)\.xml', path):
+            return self.send(rss_feed(config.seed, int(m[1]), self.base, now), 'application/rss+xml')
+        if path == '/hn/topstories.json':
+            return self.send(list(range(1000, 1000 + HN_TOP_STORIES)))
+        if m := re.fullmatch(r'/hn/item/(\d+)\.json', path):
+            return self.send(hn_story(config.seed, int(m[1]), self.base, now))
+        if m := re.fullmatch(r'/reddit/r/(\w+)/top\.json', path):
+            limit = int(query.get('limit', ['5'])[0])
+            return self.send(reddit_listing(config.seed, m[1], limit, self.base, now))
+        if path == '/arxiv/query':
+            limit = int(query.get('max_results', ['5'])[0])
+            return self.send(arxiv_feed(config.seed, limit, now), 'application/atom+xml')
+        if m := re.fullmatch(r'/page/(\d+)', path):
+            return self.send(article_page(m[1], self.base), 'text/html; charset=utf-8')
+        if path == '/image-search':
+            digest = hashlib.sha256(query.get('q', [''])[0].encode()).hexdigest()[:12]
+            return self.send({'image': f"{self.base}/images/search-{digest}.png"})
+        if m := re.fullmatch(r'/images/([\w.-]+)\.png', path):
+            return self.send(png(m[1]), 'image/png')
+        if path == '/tts':
+            return self.send(silent_mp3(query.get('text', [''])[0]), 'audio/mpeg')
+        self.send({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not self.path.endswith('/chat/completions'):
+            return self.send({'error': 'not found'}, status=404)
+        self.config.count('chat')
+        time.sleep(self.config.chat_latency)
+        if self.config.inject_error():
+            self.config.count('chat.429')
+            return self.send({'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}},
+                             status=429, headers={'Retry-After': '0.2'})
+
+        request = json.loads(body or b'{}')
+        content = chat_reply(request)
+        prompt_tokens = len(body) // 4
+        completion_tokens = len(content) // 4
+        self.send({
+            'id': f"chatcmpl-{hashlib.sha256(body).hexdigest()[:12]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'bench'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    def proxy(self, url):
+        """Serve a real response from the fixtures dir, fetching and saving it first when recording"""
+        config = self.config
+        if config.fixtures is None:
+            return self.send({'error': 'no fixtures directory configured'}, status=404)
+        url = unquote(url)
+        path = config.fixtures / f"{hashlib.sha256(url.encode()).hexdigest()[:24]}.json"
+        if config.record:
+            import requests
+            response = requests.get(url, timeout=30, headers={'User-Agent': 'ai-daily-news-bench'})
+            config.fixtures.mkdir(parents=True, exist_ok=True)
+            fixture = {
+                'url': url, 'status': response.status_code,
+                'content_type': response.headers.get('Content-Type', 'application/octet-stream'),
+                'body': response.content.decode('latin-1'),
+            }
+            path.write_text(json.dumps(fixture))
+        try:
+            fixture = json.loads(path.read_text())
+        except OSError:
+            config.count('proxy.missing')
+            return self.send({'error': f"no recording for {url}"}, status=404)
+        self.send(fixture['body'].encode('latin-1'), fixture['content_type'], fixture['status'])
+
+def serve(config, port=0):
+    """Start the server on a background thread; returns (server, base URL)"""
+    handler = type('BenchHandler', (Handler,), {'config': config})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the stand-in services on their own")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--chat-latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', help="directory of recorded responses served under /proxy/")
+    parser.add_argument('--record', action='store_true', help="fetch and save /proxy/ responses")
+    args = parser.parse_args()
+    server, base = serve(Config(chat_latency=args.chat_latency, error_rate=args.error_rate,
+                                fixtures=args.fixtures, record=args.record), args.port)
+    print(f"Serving stand-in services on {base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
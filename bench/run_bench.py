@@ -0,0 +1,240 @@
+"""
+End-to-end benchmark: run the whole pipeline (src/main.py --full) against
+the stand-in services in fake_services.py and report throughput, stage
+latency and peak memory at several candidate-article counts.
+
+Each size runs in a scratch copy of src/ so the real data/ and .cache/ are
+untouched. The first run of a size starts cold; with --repeat, later runs
+reuse that size's caches, as the cron's runs do.
+
+    python bench/run_bench.py                      # 30, 300 and 3000 candidates
+    python bench/run_bench.py --sizes 300 --repeat 3 --error-rate 0.1
+    python bench/run_bench.py --compare bench/baseline.json --tolerance 0.25
+
+--compare exits non-zero when any stage's p50 got slower than the baseline
+by more than the tolerance, or peak memory grew by more than it.
+
+--record DIR / --replay DIR fetch the real HN, Reddit, arXiv and default RSS
+endpoints through the server's /proxy/ route, saving responses to DIR or
+serving them back from it. LLM, image search and TTS stay fake either way;
+linked article pages and images are fetched directly, so replay is only
+fully offline for the source APIs.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fake_services
+
+REPO_ROOT = Path(__file__).parent.parent
+SRC_DIR = REPO_ROOT / 'src'
+
+DEFAULT_SIZES = (30, 300, 3000)
+
+# Items the non-RSS sources contribute: HN 10, Reddit 3 x 5 (minus stickied), arXiv 5
+FIXED_ITEMS = 27
+
+REAL_ENDPOINTS = {
+    'HN_API_URL': 'https://hacker-news.firebaseio.com/v0',
+    'REDDIT_API_URL': 'https://www.reddit.com',
+    'ARXIV_API_URL': 'http://export.arxiv.org/api/query',
+}
+REAL_FEEDS = ['https://openai.com/blog/rss.xml', 'https://deepmind.google/blog/rss.xml',
+              'https://huggingface.co/blog/feed.xml']
+
+def pipeline_env(base, size, replaying):
+    """Environment pointing every external call of the pipeline at the stand-ins"""
+    env = {k: v for k, v in os.environ.items() if not k.endswith('_API_KEY')}
+    if replaying:
+        env.update({name: f"{base}/proxy/{url}" for name, url in REAL_ENDPOINTS.items()})
+        env['RSS_FEEDS'] = ','.join(f"{base}/proxy/{url}" for url in REAL_FEEDS)
+    else:
+        feeds = max(1, -(-(size - FIXED_ITEMS) // fake_services.FEED_SIZE))
+        env.update({
+            'HN_API_URL': f"{base}/hn",
+            'REDDIT_API_URL': f"{base}/reddit",
+            'ARXIV_API_URL': f"{base}/arxiv/query",
+            'RSS_FEEDS': ','.join(f"{base}/rss/{n}.xml" for n in range(feeds)),
+        })
+    env.update({
+        'GROQ_API_KEY': 'bench', 'GROQ_BASE_URL': base,
+        'OPENROUTER_API_KEY': 'bench', 'OPENROUTER_BASE_URL': f"{base}/v1",
+        'IMAGE_SEARCH_URL': f"{base}/image-search",
+        'TTS_URL': f"{base}/tts",
+        # The stand-ins have no quotas; keep the buckets from dominating the timings
+        'RATE_LIMIT_SCALE': '1000',
+        'PYTHONUNBUFFERED': '1',
+    })
+    env.pop('PROFILE_STAGE', None)
+    env.pop('TRACEMALLOC_STAGE', None)
+    return env
+
+def make_workdir(root):
+    """A scratch repo layout: src/ copied from the tree, empty data/"""
+    (root / 'src').mkdir(parents=True, exist_ok=True)
+    for path in SRC_DIR.glob('*.py'):
+        shutil.copy2(path, root / 'src' / path.name)
+    for path in SRC_DIR.glob('*.json'):
+        shutil.copy2(path, root / 'src' / path.name)
+    (root / 'data').mkdir(exist_ok=True)
+
+def run_pipeline(workdir, env, log_path):
+    """Run one pipeline process; returns (wall seconds, peak RSS in MB, exit code)"""
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen([sys.executable, 'src/main.py', '--full'], cwd=workdir, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return wall, peak_mb, process.returncode
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def bench_size(size, args, workroot):
+    config = fake_services.Config(seed=args.seed, chat_latency=args.chat_latency, error_rate=args.error_rate,
+                                  fixtures=args.record or args.replay, record=bool(args.record))
+    server, base = fake_services.serve(config)
+    workdir = workroot / f"size-{size}"
+    make_workdir(workdir)
+    env = pipeline_env(base, size, replaying=bool(args.record or args.replay))
+
+    runs = []
+    try:
+        for attempt in range(args.repeat):
+            log_path = workroot / f"size-{size}-run-{attempt}.log"
+            wall, peak_mb, code = run_pipeline(workdir, env, log_path)
+            try:
+                report = json.loads((workdir / 'run_report.json').read_text())
+            except (OSError, ValueError):
+                report = {}
+            if code != 0:
+                print(f"  run {attempt} exited with {code}, see {log_path}")
+            collected = sum(v for k, v in report.get('counters', {}).items()
+                            if k.startswith('fetch.') and k.endswith('.items'))
+            runs.append({
+                'cold': attempt == 0, 'exit_code': code, 'wall_s': round(wall, 3), 'peak_rss_mb': round(peak_mb, 1),
+                'candidates': collected, 'candidates_per_s': round(collected / wall, 1) if wall else 0,
+                'stages': {name: s['total_s'] for name, s in report.get('spans', {}).items()
+                           if name.startswith('stage.')},
+                'spans': report.get('spans', {}),
+                'log': str(log_path),
+            })
+            print(f"  run {attempt} ({'cold' if attempt == 0 else 'warm'}): {collected} candidates "
+                  f"in {wall:.2f}s, peak {peak_mb:.0f} MB")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    result = {'size': size, 'runs': runs, 'server_requests': dict(sorted(config.counts.items()))}
+    result['cold'] = summarize(runs[:1])
+    if len(runs) > 1:
+        result['warm'] = summarize(runs[1:])
+    return result
+
+def summarize(runs):
+    """Median wall time and throughput, p50/p95 per stage and peak memory over runs"""
+    stages = {}
+    for name in sorted({name for run in runs for name in run['stages']}):
+        samples = [run['stages'][name] for run in runs if name in run['stages']]
+        stages[name] = {'p50_s': round(percentile(samples, 0.5), 4), 'p95_s': round(percentile(samples, 0.95), 4)}
+    return {
+        'runs': len(runs),
+        'wall_p50_s': round(percentile([r['wall_s'] for r in runs], 0.5), 3),
+        'candidates_per_s': round(percentile([r['candidates_per_s'] for r in runs], 0.5), 1),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        'stages': stages,
+    }
+
+def print_summary(results):
+    print(f"\n{'size':>6} {'run':>5} {'wall p50':>9} {'cand/s':>8} {'peak MB':>8}  stage p50 / p95 (s)")
+    for result in results:
+        for phase in ('cold', 'warm'):
+            summary = result.get(phase)
+            if summary is None:
+                continue
+            stages = '  '.join(f"{name[len('stage.'):]} {s['p50_s']:.2f}/{s['p95_s']:.2f}"
+                               for name, s in summary['stages'].items())
+            print(f"{result['size']:>6} {phase:>5} {summary['wall_p50_s']:>9.2f} {summary['candidates_per_s']:>8.1f} "
+                  f"{summary['peak_rss_mb']:>8.0f}  {stages}")
+
+def compare(results, baseline_path, tolerance):
+    """Regressions against a saved benchmark, as human-readable lines"""
+    with open(baseline_path, 'r') as f:
+        baseline = {r['size']: r for r in json.load(f)['results']}
+    problems = []
+    for result in results:
+        for phase in ('cold', 'warm'):
+            now, before = result.get(phase), baseline.get(result['size'], {}).get(phase)
+            if now is None or before is None:
+                continue
+            label = f"size {result['size']} ({phase})"
+            for name, stage in now['stages'].items():
+                old = before['stages'].get(name)
+                # Sub-50ms stages are mostly noise
+                if old and stage['p50_s'] > max(old['p50_s'], 0.05) * (1 + tolerance):
+                    problems.append(f"{label}: {name} p50 {old['p50_s']:.2f}s -> {stage['p50_s']:.2f}s")
+            if now['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance):
+                problems.append(f"{label}: peak memory {before['peak_rss_mb']:.0f} MB -> {now['peak_rss_mb']:.0f} MB")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against local stand-in services")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="candidate article counts to run at")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per size (the first is cold)")
+    parser.add_argument('--chat-latency', type=float, default=0.05, help="seconds per fake chat completion")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="share of chat requests answered 429")
+    parser.add_argument('--seed', type=int, default=0)
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument('--record', metavar='DIR', help="fetch real source responses and save them to DIR")
+    recording.add_argument('--replay', metavar='DIR', help="serve source responses recorded in DIR")
+    parser.add_argument('--output', help="write the results as JSON (usable as a --compare baseline)")
+    parser.add_argument('--compare', metavar='BASELINE', help="fail on regressions against a saved --output")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown / growth for --compare")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch directories and logs")
+    args = parser.parse_args()
+
+    workroot = Path(tempfile.mkdtemp(prefix='news-bench-'))
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} candidates...")
+            results.append(bench_size(size, args, workroot))
+    finally:
+        if args.keep:
+            print(f"Scratch directories kept in {workroot}")
+        else:
+            shutil.rmtree(workroot, ignore_errors=True)
+
+    print_summary(results)
+    if args.output:
+        for result in results:
+            for run in result['runs']:
+                run.pop('log', None)
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'settings': {
+                'chat_latency': args.chat_latency, 'error_rate': args.error_rate, 'seed': args.seed,
+                'repeat': args.repeat}, 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    failed = any(run['exit_code'] != 0 for result in results for run in result['runs'])
+    if args.compare:
+        problems = compare(results, args.compare, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
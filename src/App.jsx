@@ -3,6 +3,7 @@ import Header from './components/Header'
 import HeroArticle from './components/HeroArticle'
 import NewsGrid from './components/NewsGrid'
 import PodcastPlayer from './components/PodcastPlayer'
+import SearchBox from './components/SearchBox'
 
 function App() {
     const [theme, setTheme] = useState(() => {
@@ -10,6 +11,8 @@ function App() {
     })
     const [newsData, setNewsData] = useState(null)
     const [loading, setLoading] = useState(true)
+    const [shardsLoaded, setShardsLoaded] = useState(1)
+    const [loadingOlder, setLoadingOlder] = useState(false)
 
     useEffect(() => {
         document.documentElement.setAttribute('data-theme', theme)
@@ -17,9 +20,16 @@ function App() {
     }, [theme])
 
     useEffect(() => {
-        // Fetch news data with cache busting
+        // The index is small and changes every run, so bypass caches for it;
+        // shards are content-addressed and can come straight from cache
         fetch(`data/news.json?t=${new Date().getTime()}`)
             .then(response => response.json())
+            .then(index => {
+                if (index.articles) return index  // single-file format from older runs
+                return fetch(index.latest)
+                    .then(response => response.json())
+                    .then(shard => ({ ...index, articles: shard.articles }))
+            })
             .then(data => {
                 setNewsData(data)
                 setLoading(false)
@@ -30,6 +40,22 @@ function App() {
             })
     }, [])
 
+    const loadOlder = () => {
+        const shard = newsData.shards[shardsLoaded]
+        setLoadingOlder(true)
+        fetch(shard.path)
+            .then(response => response.json())
+            .then(({ articles }) => {
+                setNewsData(prev => {
+                    const seen = new Set(prev.articles.map(a => a.url))
+                    return { ...prev, articles: [...prev.articles, ...articles.filter(a => !seen.has(a.url))] }
+                })
+                setShardsLoaded(n => n + 1)
+            })
+            .catch(error => console.error('Error loading older news:', error))
+            .finally(() => setLoadingOlder(false))
+    }
+
     const toggleTheme = () => {
         setTheme(prev => prev === 'light' ? 'dark' : 'light')
     }
@@ -51,6 +77,8 @@ function App() {
                         </div>
                     ) : newsData && newsData.articles && newsData.articles.length > 0 ? (
                         <>
+                            <SearchBox />
+
                             <div style={{
                                 fontSize: '14px',
                                 color: 'var(--text-secondary)',
@@ -67,6 +95,14 @@ function App() {
                             {newsData.podcast && <PodcastPlayer podcast={newsData.podcast} />}
 
                             <NewsGrid articles={newsData.articles.slice(1)} />
+
+                            {newsData.shards && shardsLoaded < newsData.shards.length && (
+                                <div style={{ textAlign: 'center', marginTop: '32px' }}>
+                                    <button className="load-older" onClick={loadOlder} disabled={loadingOlder}>
+                                        {loadingOlder ? 'Loading...' : `Load ${newsData.shards[shardsLoaded].date}`}
+                                    </button>
+                                </div>
+                            )}
                         </>
                     ) : (
                         <div style={{ textAlign: 'center', padding: '60px 0', color: 'var(--text-secondary)' }}>
@@ -0,0 +1,88 @@
+"""
+Per-stage checkpoints of a pipeline run, so a failed or partial run can be
+picked up from the last stage that completed.
+
+Each stage's output is stored as .cache/checkpoints/<stage>.json; run.json
+records when the run started, its options and which stages are done.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+CHECKPOINT_DIR = Path(__file__).parent.parent / '.cache' / 'checkpoints'
+RUN_PATH = CHECKPOINT_DIR / 'run.json'
+
+# An unfinished run older than this is started over rather than resumed:
+# its fetched news would be stale by the next scheduled run anyway
+MAX_RESUME_AGE = 3 * 3600
+
+def _write(path, data):
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def _read(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def current_run():
+    """The recorded run ({started, options, completed, finished[, partial]}), or None"""
+    return _read(RUN_PATH)
+
+def resumable(options, max_age=MAX_RESUME_AGE):
+    """The unfinished run to resume, if it is recent and was started with the same options"""
+    run = current_run()
+    if not run or run.get('finished') or run.get('partial') or run.get('options') != options:
+        return None
+    if time.time() - run.get('started', 0) > max_age:
+        return None
+    return run
+
+def start_run(options, partial=False):
+    """Begin a new run, discarding every checkpoint of the previous one; a partial run is never resumed"""
+    if CHECKPOINT_DIR.exists():
+        for path in CHECKPOINT_DIR.glob('*.json'):
+            path.unlink()
+    run = {'started': time.time(), 'options': options, 'completed': [], 'finished': False}
+    if partial:
+        run['partial'] = True
+    _write(RUN_PATH, run)
+    return run
+
+def save(stage, data):
+    """Store a stage's output and mark the stage completed in the current run"""
+    _write(CHECKPOINT_DIR / f"{stage}.json", data)
+    run = current_run() or {'started': time.time(), 'options': None, 'completed': [], 'finished': False}
+    if stage not in run['completed']:
+        run['completed'].append(stage)
+    _write(RUN_PATH, run)
+
+def rewind(stages, options):
+    """
+    Reopen the current run under options, with only the given stages counted
+    as completed, for a partial rerun. A partial run is never resumed: its
+    earlier checkpoints may be long stale.
+    """
+    run = current_run() or {'started': time.time()}
+    run['options'] = options
+    run['completed'] = [stage for stage in run.get('completed', []) if stage in stages]
+    run['finished'] = False
+    run['partial'] = True
+    _write(RUN_PATH, run)
+
+def load(stage):
+    """A stage's stored output, or None if that stage has no checkpoint"""
+    return _read(CHECKPOINT_DIR / f"{stage}.json")
+
+def finish_run():
+    """Mark the current run finished; its checkpoints stay for partial reruns"""
+    run = current_run()
+    if run:
+        run['finished'] = True
+        _write(RUN_PATH, run)
@@ -4,6 +4,7 @@ import { ExternalLink } from 'lucide-react'
 function ArticleCard({ article }) {
     const [isHovered, setIsHovered] = useState(false)
     const [ripples, setRipples] = useState([])
+    const meta = article.image_meta
 
     const handleClick = (e) => {
         const card = e.currentTarget
@@ -68,7 +69,11 @@ function ArticleCard({ article }) {
                     position: 'relative'
                 }}>
                     <img
-                        src={article.image}
+                        src={meta ? meta.variants[meta.variants.length - 1].path : article.image}
+                        srcSet={meta ? meta.variants.map(v => `${v.path} ${v.width}w`).join(', ') : undefined}
+                        sizes={meta ? '(max-width: 768px) 100vw, 400px' : undefined}
+                        width={meta?.width}
+                        height={meta?.height}
                         alt={article.title}
                         loading="lazy"
                         className="article-image"
@@ -76,10 +81,13 @@ function ArticleCard({ article }) {
                             width: '100%',
                             height: '100%',
                             objectFit: 'cover',
+                            backgroundImage: meta ? `url(${meta.placeholder})` : undefined,
+                            backgroundSize: 'cover',
                             transform: isHovered ? 'scale(1.1)' : 'scale(1)',
                             transition: 'transform 0.5s cubic-bezier(0.4, 0, 0.2, 1)'
                         }}
                         onError={(e) => {
+                            e.target.srcset = ''
                             e.target.src = 'https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=450&fit=crop'
                         }}
                     />
@@ -2,6 +2,7 @@ import { ExternalLink } from 'lucide-react'
 
 function HeroArticle({ article }) {
     if (!article) return null
+    const meta = article.image_meta
 
     return (
         <div className="glass-card fade-in-up" style={{
@@ -22,17 +23,24 @@ function HeroArticle({ article }) {
                         position: 'relative'
                     }}>
                         <img
-                            src={article.image}
+                            src={meta ? meta.variants[meta.variants.length - 1].path : article.image}
+                            srcSet={meta ? meta.variants.map(v => `${v.path} ${v.width}w`).join(', ') : undefined}
+                            sizes={meta ? '(max-width: 1200px) 100vw, 1200px' : undefined}
+                            width={meta?.width}
+                            height={meta?.height}
                             alt={article.title}
                             style={{
                                 width: '100%',
                                 height: '100%',
                                 objectFit: 'cover',
+                                backgroundImage: meta ? `url(${meta.placeholder})` : undefined,
+                                backgroundSize: 'cover',
                                 transition: 'transform 0.6s ease'
                             }}
                             onMouseEnter={(e) => e.target.style.transform = 'scale(1.05)'}
                             onMouseLeave={(e) => e.target.style.transform = 'scale(1)'}
                             onError={(e) => {
+                                e.target.srcset = ''
                                 e.target.src = 'https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=450&fit=crop'
                             }}
                         />
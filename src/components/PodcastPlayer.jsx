@@ -4,7 +4,7 @@ import { Play, Pause, Download, Volume2, SkipForward, SkipBack } from 'lucide-re
 function PodcastPlayer({ podcast }) {
     const [isPlaying, setIsPlaying] = useState(false)
     const [currentTime, setCurrentTime] = useState(0)
-    const [duration, setDuration] = useState(0)
+    const [duration, setDuration] = useState(podcast.duration || 0)
     const [playbackRate, setPlaybackRate] = useState(1)
     const audioRef = useRef(null)
 
@@ -13,7 +13,9 @@ function PodcastPlayer({ podcast }) {
         if (!audio) return
 
         const updateTime = () => setCurrentTime(audio.currentTime)
-        const updateDuration = () => setDuration(audio.duration)
+        const updateDuration = () => {
+            if (isFinite(audio.duration)) setDuration(audio.duration)
+        }
         const handleEnded = () => setIsPlaying(false)
 
         audio.addEventListener('timeupdate', updateTime)
@@ -42,6 +44,11 @@ function PodcastPlayer({ podcast }) {
         setCurrentTime(seekTime)
     }
 
+    const seekTo = (time) => {
+        audioRef.current.currentTime = time
+        setCurrentTime(time)
+    }
+
     const skip = (seconds) => {
         audioRef.current.currentTime += seconds
     }
@@ -276,6 +283,46 @@ function PodcastPlayer({ podcast }) {
                     +10s
                 </button>
             </div>
+
+            {/* Chapters */}
+            {podcast.chapters && podcast.chapters.length > 0 && (
+                <div style={{
+                    marginTop: '20px',
+                    paddingTop: '12px',
+                    borderTop: '1px solid var(--border)',
+                    maxHeight: '220px',
+                    overflowY: 'auto'
+                }}>
+                    {podcast.chapters.map((chapter, i) => {
+                        const active = currentTime >= chapter.start && currentTime < chapter.end
+                        return (
+                            <button
+                                key={i}
+                                onClick={() => seekTo(chapter.start)}
+                                style={{
+                                    display: 'flex',
+                                    gap: '12px',
+                                    width: '100%',
+                                    padding: '8px 4px',
+                                    background: 'transparent',
+                                    border: 'none',
+                                    textAlign: 'left',
+                                    cursor: 'pointer',
+                                    fontSize: '13px',
+                                    color: active ? 'var(--accent)' : 'var(--text-secondary)'
+                                }}
+                            >
+                                <span style={{ fontVariantNumeric: 'tabular-nums', flexShrink: 0 }}>
+                                    {formatTime(chapter.start)}
+                                </span>
+                                <span>
+                                    <strong style={{ color: active ? 'var(--accent)' : 'var(--text-primary)' }}>{chapter.speaker}:</strong> {chapter.title}
+                                </span>
+                            </button>
+                        )
+                    })}
+                </div>
+            )}
         </div>
     )
 }
@@ -0,0 +1,113 @@
+import { Search } from 'lucide-react'
+import { useState, useEffect } from 'react'
+import { search } from '../search'
+
+function SearchBox() {
+    const [query, setQuery] = useState('')
+    const [results, setResults] = useState([])
+    const [error, setError] = useState(false)
+
+    useEffect(() => {
+        if (!query.trim()) {
+            setResults([])
+            return
+        }
+        let cancelled = false
+        // Short debounce; only the index shards this query needs are fetched
+        const timer = setTimeout(() => {
+            search(query)
+                .then(found => {
+                    if (!cancelled) {
+                        setResults(found)
+                        setError(false)
+                    }
+                })
+                .catch(err => {
+                    console.error('Search failed:', err)
+                    if (!cancelled) setError(true)
+                })
+        }, 150)
+        return () => {
+            cancelled = true
+            clearTimeout(timer)
+        }
+    }, [query])
+
+    return (
+        <div style={{ position: 'relative', marginBottom: '24px' }}>
+            <div style={{
+                display: 'flex',
+                alignItems: 'center',
+                gap: '8px',
+                backgroundColor: 'var(--bg-card)',
+                border: '1px solid var(--border)',
+                borderRadius: '999px',
+                padding: '8px 16px'
+            }}>
+                <Search size={16} color="var(--text-secondary)" />
+                <input
+                    type="search"
+                    value={query}
+                    onChange={e => setQuery(e.target.value)}
+                    placeholder="Search the archive..."
+                    aria-label="Search articles"
+                    style={{
+                        flex: 1,
+                        border: 'none',
+                        outline: 'none',
+                        background: 'transparent',
+                        color: 'var(--text-primary)',
+                        fontSize: '14px'
+                    }}
+                />
+            </div>
+
+            {query.trim() && (
+                <ul style={{
+                    position: 'absolute',
+                    top: 'calc(100% + 8px)',
+                    left: 0,
+                    right: 0,
+                    zIndex: 10,
+                    listStyle: 'none',
+                    margin: 0,
+                    padding: '8px 0',
+                    maxHeight: '400px',
+                    overflowY: 'auto',
+                    backgroundColor: 'var(--bg-card)',
+                    border: '1px solid var(--border)',
+                    borderRadius: '16px'
+                }}>
+                    {error && (
+                        <li style={{ padding: '8px 16px', color: 'var(--text-secondary)', fontSize: '14px' }}>
+                            Search is unavailable right now.
+                        </li>
+                    )}
+                    {!error && results.length === 0 && (
+                        <li style={{ padding: '8px 16px', color: 'var(--text-secondary)', fontSize: '14px' }}>
+                            No matching articles.
+                        </li>
+                    )}
+                    {results.map(result => (
+                        <li key={result.url}>
+                            <a href={result.url} target="_blank" rel="noopener noreferrer" style={{
+                                display: 'block',
+                                padding: '8px 16px',
+                                color: 'var(--text-primary)',
+                                textDecoration: 'none',
+                                fontSize: '14px'
+                            }}>
+                                <div style={{ fontWeight: '600' }}>{result.title}</div>
+                                <div style={{ color: 'var(--text-secondary)', fontSize: '12px' }}>
+                                    {result.source} · {result.date}
+                                </div>
+                            </a>
+                        </li>
+                    ))}
+                </ul>
+            )}
+        </div>
+    )
+}
+
+export default SearchBox
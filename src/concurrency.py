@@ -0,0 +1,64 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Upper bound on threads used by a single bounded_map call
+MAX_WORKERS = 16
+
+# Simultaneous requests allowed against any one host
+PER_HOST_LIMIT = 6
+
+# Hosts built for many small parallel requests get more slots (up to the HTTP pool size)
+HOST_LIMITS = {
+    'hacker-news.firebaseio.com': 16,
+}
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def _host_semaphore(host):
+    """Return the shared semaphore guarding requests to a host"""
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(HOST_LIMITS.get(host, PER_HOST_LIMIT))
+            _host_semaphores[host] = sem
+        return sem
+
+@contextmanager
+def host_slot(url):
+    """Hold one of the per-host connection slots while talking to url's host"""
+    sem = _host_semaphore(urlparse(url).netloc)
+    with sem:
+        yield
+
+def bounded_map(fn, items, max_workers=MAX_WORKERS, timeout=None):
+    """
+    Run fn over items in a bounded thread pool.
+
+    Results are returned in input order. Items that raise, or that have not
+    finished when timeout (seconds) expires, produce None.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    futures = [executor.submit(fn, item) for item in items]
+    try:
+        wait(futures, timeout=timeout)
+        results = []
+        for future in futures:
+            if not future.done():
+                future.cancel()
+                results.append(None)
+            elif future.exception() is not None:
+                print(f"Worker failed: {future.exception()}")
+                results.append(None)
+            else:
+                results.append(future.result())
+        return results
+    finally:
+        # Don't block on stragglers past the deadline; their requests carry timeouts
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+import re
+import zlib
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'ref', 'ref_src', 'ref_url', 'source', 'src', 'fbclid', 'gclid', 'dclid', 'mc_cid', 'mc_eid',
+    'igshid', 'share', 'si', 'cmpid', 'campaign', 'via', 'trk', 'sr_share', 'rss', 'feature',
+}
+
+# Redirect wrappers whose real target is carried in a query parameter: host -> (path, parameter),
+# where a path of None means any path on that host
+REDIRECT_PARAMS = {
+    'out.reddit.com': (None, 'url'),
+    'l.facebook.com': (None, 'u'),
+    'google.com': ('/url', 'q'),
+    't.umblr.com': (None, 'z'),
+}
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'how', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'we', 'what', 'why', 'with', 'you', 'your',
+}
+
+# MinHash / LSH parameters: 8 bands of 4 rows catch pairs with Jaccard above ~0.5
+NUM_HASHES = 32
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+
+# Titles at least this similar (Jaccard over shingles) are treated as the same story
+SIMILARITY_THRESHOLD = 0.5
+
+# Cap on exact comparisons per item within one LSH bucket
+MAX_BUCKET_COMPARE = 50
+
+_PRIME = (1 << 61) - 1
+_COEFFS = [((i + 1) * 0x9E3779B97F4A7C15 % _PRIME, (i + 7) * 0xC2B2AE3D27D4EB4F % _PRIME) for i in range(NUM_HASHES)]
+
+def _host(parts):
+    host = parts.netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+def _redirect_target(parts):
+    """The URL a redirect wrapper points at, or None if parts isn't one"""
+    path, param = REDIRECT_PARAMS.get(_host(parts), (None, None))
+    if not param or (path is not None and parts.path != path):
+        return None
+    # parse_qsl has already percent-decoded the value
+    target = dict(parse_qsl(parts.query)).get(param)
+    if not target:
+        return None
+    target = target.strip()
+    target_parts = urlsplit(target)
+    if target_parts.scheme not in ('http', 'https') or not target_parts.netloc:
+        return None
+    return target
+
+def canonical_url(url):
+    """
+    Reduce a URL to a canonical form for identity checks.
+
+    Unwraps redirect links, forces https, drops www., fragments, trailing
+    slashes and tracking parameters, and sorts what is left of the query.
+    """
+    url = url.strip()
+    for _ in range(3):  # wrappers can be nested
+        target = _redirect_target(urlsplit(url))
+        if not target:
+            break
+        url = target
+
+    parts = urlsplit(url)
+    host = _host(parts)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+def article_link(item):
+    """The URL an article points at, looking through Reddit link posts to their target"""
+    return item.get('link_url') or item['url']
+
+def _shingles(title):
+    tokens = [t for t in re.findall(r'[a-z0-9]+', title.lower()) if t not in STOPWORDS]
+    shingles = set(tokens)
+    shingles.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return shingles
+
+def _minhash(shingles):
+    hashed = [zlib.crc32(s.encode()) for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashed) for a, b in _COEFFS]
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def _union(parent, i, j):
+    ri, rj = _find(parent, i), _find(parent, j)
+    if ri != rj:
+        # Keep the earliest item as the root so clusters are stable in fetch order
+        parent[max(ri, rj)] = min(ri, rj)
+
+def _outlet(item):
+    """Who published an item: each RSS feed is its own outlet, other sources count as one"""
+    if item['source'] == 'RSS':
+        return ('RSS', item.get('source_name'))
+    return (item['source'], None)
+
+def cluster(items):
+    """
+    Group items that share a canonical URL, or that come from different sources
+    with near-duplicate titles. Returns lists of indices, in fetch order.
+    """
+    parent = list(range(len(items)))
+
+    by_url = {}
+    for i, item in enumerate(items):
+        key = canonical_url(article_link(item))
+        if key in by_url:
+            _union(parent, by_url[key], i)
+        else:
+            by_url[key] = i
+
+    shingles = [_shingles(item.get('title', '')) for item in items]
+    buckets = defaultdict(list)
+    for i, s in enumerate(shingles):
+        if len(s) < 3:  # too short to compare reliably
+            continue
+        signature = _minhash(s)
+        for band in range(BANDS):
+            buckets[(band, tuple(signature[band * ROWS:(band + 1) * ROWS]))].append(i)
+
+    # Only items sharing a bucket are compared, so this stays near-linear in the pool size
+    for members in buckets.values():
+        for x in range(1, len(members)):
+            j = members[x]
+            for i in members[max(0, x - MAX_BUCKET_COMPARE):x]:
+                if _find(parent, i) == _find(parent, j):
+                    break
+                # Within one source, similar titles are separate stories (e.g. related arXiv papers)
+                if _outlet(items[i]) == _outlet(items[j]):
+                    continue
+                if _jaccard(shingles[i], shingles[j]) >= SIMILARITY_THRESHOLD:
+                    _union(parent, i, j)
+                    break
+
+    clusters = defaultdict(list)
+    for i in range(len(items)):
+        clusters[_find(parent, i)].append(i)
+    return [clusters[root] for root in sorted(clusters)]
+
+def merge_cluster(items):
+    """Merge duplicate items into the first one, listing every source it was seen in"""
+    merged = items[0].copy()
+    merged['sources'] = []
+    seen = set()
+    for item in items:
+        key = (item['source_name'] or item['source'], item['url'])
+        if key not in seen:
+            seen.add(key)
+            merged['sources'].append({
+                'source': item['source'],
+                'source_name': item['source_name'],
+                'url': item['url'],
+            })
+        if len(item.get('description', '')) > len(merged.get('description', '')):
+            merged['description'] = item['description']
+        if not merged.get('image') and item.get('image'):
+            merged['image'] = item['image']
+        for key in ('score', 'comments'):
+            if key in item:
+                merged[key] = max(merged.get(key, 0), item[key])
+    return merged
+
+def dedupe_articles(items):
+    """Collapse cross-source duplicates, keeping fetch order of each cluster's first item"""
+    return [merge_cluster([items[i] for i in members]) for members in cluster(items)]
@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent.parent / '.cache' / 'hn_items.json'
+
+# Story fields kept; everything but score and comment count is fixed once posted
+FIELDS = ('id', 'type', 'title', 'url', 'time', 'score', 'descendants', 'dead', 'deleted')
+
+# Entries not seen in topstories for this long are dropped
+MAX_AGE = 3 * 24 * 3600
+
+class HNItemCache:
+    """Persistent store of Hacker News items keyed by story id"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, story_id):
+        """Return (item, fetched_at) for a cached story, or None"""
+        with self.lock:
+            entry = self.entries.get(str(story_id))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry['seen_at'] = time.time()
+            return entry['item'], entry['fetched_at']
+
+    def put(self, story_id, item):
+        """Store the fields of item we use; returns (item, fetched_at) like get"""
+        item = {k: item[k] for k in FIELDS if k in item} if item else {}
+        now = time.time()
+        with self.lock:
+            self.entries[str(story_id)] = {'item': item, 'fetched_at': now, 'seen_at': now}
+        return item, now
+
+    def save(self, max_age=MAX_AGE):
+        """Write the cache to disk, dropping stories that have left the front pages"""
+        cutoff = time.time() - max_age
+        with self.lock:
+            self.entries = {k: v for k, v in self.entries.items() if v['seen_at'] >= cutoff}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+        }
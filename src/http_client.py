@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import instrumentation
+from concurrency import host_slot
+
+CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'http'
+
+# Responses younger than this are served from disk without revalidating
+DEFAULT_TTL = 0
+
+# Total size the response cache may grow to before the oldest entries are evicted
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# Entries not used for this long are evicted regardless of size
+MAX_CACHE_AGE = 7 * 24 * 3600
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+_session = None
+_session_lock = threading.Lock()
+
+stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+def _count(key):
+    with _stats_lock:
+        stats[key] += 1
+
+def get_session():
+    """Return the process-wide session, pooling keep-alive connections per host"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=16)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept-Encoding': 'gzip, deflate',
+            })
+            _session = session
+        return _session
+
+def _cache_paths(url):
+    key = hashlib.sha256(url.encode()).hexdigest()
+    return CACHE_DIR / f"{key}.json", CACHE_DIR / f"{key}.body"
+
+def _load_cached(url):
+    meta_path, body_path = _cache_paths(url)
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    return meta, body
+
+def _atomic_write(path, data):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _store(url, response):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    meta_path, body_path = _cache_paths(url)
+    meta = {
+        'url': url,
+        'stored_at': time.time(),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'headers': {
+            k: v for k, v in response.headers.items()
+            if k.lower() in ('content-type', 'etag', 'last-modified')
+        },
+    }
+    _atomic_write(body_path, response.content)
+    _atomic_write(meta_path, json.dumps(meta).encode())
+
+def _touch(url, meta):
+    meta['stored_at'] = time.time()
+    meta_path, body_path = _cache_paths(url)
+    try:
+        _atomic_write(meta_path, json.dumps(meta).encode())
+        os.utime(body_path)
+    except OSError:
+        pass
+
+def _cached_response(url, meta, body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = url
+    response.from_cache = True
+    return response
+
+def get(url, headers=None, timeout=10, cache=True, ttl=DEFAULT_TTL, **kwargs):
+    """
+    GET url through the shared session.
+
+    With cache enabled, 200 responses are kept on disk. Entries younger than
+    ttl seconds are returned as-is; older ones are revalidated with
+    If-None-Match / If-Modified-Since so an unchanged resource costs a 304.
+    params are folded into url first, so the cache is keyed on the full
+    request URL.
+    """
+    if kwargs.get('params'):
+        url = requests.Request('GET', url, params=kwargs.pop('params')).prepare().url
+    headers = dict(headers or {})
+    meta, body = (None, None)
+    if cache and not kwargs.get('stream'):
+        meta, body = _load_cached(url)
+        if meta is not None:
+            if time.time() - meta['stored_at'] < ttl:
+                _count('hits')
+                try:
+                    os.utime(_cache_paths(url)[1])
+                except OSError:
+                    pass
+                instrumentation.incr('http.bytes_from_cache', len(body))
+                return _cached_response(url, meta, body)
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+    else:
+        cache = False
+
+    with host_slot(url):
+        response = get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+    instrumentation.incr('http.requests')
+    if not kwargs.get('stream'):
+        instrumentation.incr('http.bytes_received', len(response.content))
+
+    if cache and response.status_code == 304 and meta is not None:
+        _count('revalidated')
+        _touch(url, meta)
+        return _cached_response(url, meta, body)
+
+    if cache:
+        _count('misses')
+        if response.status_code == 200:
+            try:
+                _store(url, response)
+            except OSError as e:
+                print(f"Could not cache response for {url}: {e}")
+    return response
+
+def prune_cache(max_bytes=MAX_CACHE_BYTES, max_age=MAX_CACHE_AGE):
+    """Evict stale entries, then least recently used ones until the cache fits in max_bytes"""
+    if not CACHE_DIR.exists():
+        return
+    entries = []
+    total = 0
+    for body_path in CACHE_DIR.glob('*.body'):
+        st = body_path.stat()
+        entries.append((st.st_mtime, st.st_size, body_path))
+        total += st.st_size
+
+    entries.sort()
+    cutoff = time.time() - max_age
+    removed = 0
+    for mtime, size, body_path in entries:
+        if total <= max_bytes and mtime >= cutoff:
+            break
+        for path in (body_path, body_path.with_suffix('.json')):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+    if removed:
+        print(f"HTTP cache: evicted {removed} entries, {total / 1e6:.1f} MB remaining")
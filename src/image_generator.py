@@ -1,10 +1,12 @@
 import os
-import requests
+import http_client
 import hashlib
-from pathlib import Path
-from duckduckgo_search import DDGS
+import image_store
+import instrumentation
 import time
 import random
+import rate_limit
+import relevance
 
 def generate_image_prompt(title, summary=""):
     """Generate a descriptive prompt for image generation based on article content"""
@@ -15,27 +17,28 @@ def generate_image_prompt(title, summary=""):
     prompt += ". Style: clean, tech-focused, professional news media aesthetic."
     return prompt
 
-def get_cache_path(article_title):
-    """Generate a cache filename based on article title"""
-    cache_dir = Path(__file__).parent.parent / 'data' / 'images'
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create hash of title for filename
-    title_hash = hashlib.md5(article_title.encode()).hexdigest()
-    return cache_dir / f"{title_hash}.png"
+# JSON image search endpoint ({"image": url}) used instead of DuckDuckGo when set, e.g. by bench/
+IMAGE_SEARCH_URL = os.environ.get('IMAGE_SEARCH_URL')
 
 def fetch_image_from_web(query):
     """Fetch an image URL using DuckDuckGo"""
+    if IMAGE_SEARCH_URL:
+        with instrumentation.span('image.search'):
+            return http_client.get(IMAGE_SEARCH_URL, params={'q': query}, cache=False).json().get('image')
     try:
-        results = list(DDGS().images(
-            query,
-            max_results=1,
-            safesearch='on',
-            size='Medium',
-        ))
+        from duckduckgo_search import DDGS
+        rate_limit.acquire('duckduckgo')
+        with instrumentation.span('image.search'):
+            results = list(DDGS().images(
+                query,
+                max_results=1,
+                safesearch='on',
+                size='Medium',
+            ))
         if results:
             return results[0]['image']
     except Exception as e:
+        instrumentation.incr('errors.image_search')
         print(f"Error fetching image for '{query}': {e}")
     return None
 
@@ -51,12 +54,10 @@ def generate_article_image(title, summary="", force=False):
     Returns:
         Relative path to generated image or None if generation fails
     """
-    cache_path = get_cache_path(title)
-    
-    # Return cached image if exists (as relative path)
-    if cache_path.exists() and not force:
-        # Convert to relative path for web usage
-        return f"data/images/{cache_path.name}"
+    # Return cached image if one is stored for this title (as relative path)
+    cached = image_store.lookup_title(title)
+    if cached and not force:
+        return cached
     
     try:
         # 1. Try to fetch a relevant image from the web
@@ -70,37 +71,32 @@ def generate_article_image(title, summary="", force=False):
             image_url = get_unsplash_image(title)
         
         if image_url:
-            # Download and cache
-            # Add a user agent to avoid being blocked
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(image_url, headers=headers, timeout=15)
+            # Another title may already have resolved to the same image
+            cached = image_store.lookup_url(title, image_url)
+            if cached:
+                return cached
+
+            # Download and store by content hash (not in the HTTP cache)
+            with instrumentation.span('image.download'):
+                response = http_client.get(image_url, timeout=15, cache=False)
             if response.status_code == 200:
-                with open(cache_path, 'wb') as f:
-                    f.write(response.content)
-                # Return relative path for web usage
-                return f"data/images/{cache_path.name}"
+                path = image_store.store(title, image_url, response.content)
+                if path:
+                    return path
+                print(f"Downloaded data from {image_url} is not a supported image")
             else:
                 print(f"Failed to download image from {image_url}: Status {response.status_code}")
                 
     except Exception as e:
+        instrumentation.incr('errors.image_fetch')
         print(f"Image fetching failed for '{title}': {e}")
     
     return None
 
 def extract_keywords(title):
     """Extract key terms from title for image search"""
-    # AI/ML related keywords
-    ai_keywords = ['ai', 'artificial intelligence', 'machine learning', 'deep learning', 
-                   'neural network', 'llm', 'gpt', 'model', 'algorithm', 'data']
-    
-    title_lower = title.lower()
-    
-    # Check for AI keywords
-    for keyword in ai_keywords:
-        if keyword in title_lower:
-            return 'artificial intelligence technology'
+    if relevance.is_relevant(title):
+        return 'artificial intelligence technology'
     
     # Default tech theme
     return 'technology innovation'
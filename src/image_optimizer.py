@@ -0,0 +1,96 @@
+import base64
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+VARIANTS_DIR = REPO_ROOT / 'data' / 'images' / 'variants'
+
+# Widths generated for responsive images; wider sources are never upscaled
+VARIANT_WIDTHS = (400, 800, 1200)
+VARIANT_QUALITY = 75
+
+# Width of the inline low-quality placeholder
+PLACEHOLDER_WIDTH = 16
+
+def _encode_webp(image, quality):
+    buf = io.BytesIO()
+    image.save(buf, format='WEBP', quality=quality, method=4)
+    return buf.getvalue()
+
+def optimize_image(relative_path):
+    """
+    Decode a stored image and write resized WebP variants next to it.
+
+    Metadata is dropped by re-encoding from pixels only. Returns the
+    image_meta dict for an article, or None if the image can't be decoded.
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    from PIL import Image, ImageOps
+
+    source = REPO_ROOT / relative_path
+    stem = source.stem
+    try:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    except Exception as e:
+        print(f"Could not decode {relative_path}: {e}")
+        return None
+
+    width, height = image.size
+    VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    variants = []
+    for target in VARIANT_WIDTHS:
+        w = min(target, width)
+        h = max(1, round(height * w / width))
+        out = VARIANTS_DIR / f"{stem}-{w}.webp"
+        if not out.exists():
+            resized = image if w == width else image.resize((w, h), Image.LANCZOS)
+            tmp = out.with_name(f"{out.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(_encode_webp(resized, VARIANT_QUALITY))
+            os.replace(tmp, out)
+        variants.append({'width': w, 'height': h, 'path': f"data/images/variants/{out.name}"})
+        if target >= width:
+            break
+
+    tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+    placeholder = "data:image/webp;base64," + base64.b64encode(_encode_webp(tiny, 30)).decode()
+
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': placeholder,
+        'variants': variants,
+    }
+
+def optimize_articles(articles, max_workers=None):
+    """
+    Attach image_meta (size, placeholder, WebP variants) to articles with locally stored images.
+
+    Encoding is CPU-bound, so distinct images are converted in a process pool.
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow not installed, skipping image optimization")
+        return articles
+
+    pending = sorted({
+        a['image'] for a in articles
+        if a.get('image', '').startswith('data/images/') and not a.get('image_meta')
+    })
+    if not pending:
+        return articles
+
+    print(f"Optimizing {len(pending)} images...")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(pending, pool.map(optimize_image, pending)))
+
+    for article in articles:
+        meta = results.get(article.get('image'))
+        if meta:
+            article['image_meta'] = meta
+    return articles
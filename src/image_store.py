@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+IMAGES_DIR = REPO_ROOT / 'data' / 'images'
+INDEX_PATH = IMAGES_DIR / 'index.json'
+
+# Magic numbers for the formats we accept, mapped to (MIME type, extension)
+SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png', 'png'),
+    (b'\xff\xd8\xff', 'image/jpeg', 'jpg'),
+    (b'GIF87a', 'image/gif', 'gif'),
+    (b'GIF89a', 'image/gif', 'gif'),
+    (b'BM', 'image/bmp', 'bmp'),
+]
+
+_lock = threading.Lock()
+_index = None
+
+def sniff_image_type(data):
+    """Detect an image's (MIME type, extension) from its bytes, or None if it isn't a supported image"""
+    for magic, mime, ext in SIGNATURES:
+        if data.startswith(magic):
+            return mime, ext
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    if data[4:8] == b'ftyp' and data[8:12] in (b'avif', b'avis'):
+        return 'image/avif', 'avif'
+    return None
+
+def _key(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def _relative(path):
+    return f"data/images/{Path(path).name}"
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(INDEX_PATH, 'r') as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+        _index.setdefault('titles', {})
+        _index.setdefault('urls', {})
+    return _index
+
+def _save_index():
+    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = INDEX_PATH.with_name(f"index.json.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(_index, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, INDEX_PATH)
+
+def _existing(name):
+    return name if name and (IMAGES_DIR / name).exists() else None
+
+def lookup_title(title):
+    """Return the stored image path for an article title, if any"""
+    with _lock:
+        name = _existing(_load_index()['titles'].get(_key(title)))
+    if name:
+        return _relative(name)
+    # Images cached before the content-addressed store were named md5(title).png
+    legacy = IMAGES_DIR / f"{hashlib.md5(title.encode()).hexdigest()}.png"
+    if legacy.exists():
+        return _relative(legacy)
+    return None
+
+def lookup_url(title, image_url):
+    """Return the stored image already downloaded from image_url, linking it to title"""
+    with _lock:
+        index = _load_index()
+        name = _existing(index['urls'].get(_key(image_url)))
+        if name:
+            index['titles'][_key(title)] = name
+            _save_index()
+    return _relative(name) if name else None
+
+def store(title, image_url, data):
+    """
+    Store downloaded image bytes under a hash of their content.
+
+    Identical images share one file. Returns the relative web path, or None
+    when the data is not a recognised image.
+    """
+    kind = sniff_image_type(data)
+    if kind is None:
+        return None
+    _, ext = kind
+    name = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext}"
+    path = IMAGES_DIR / name
+
+    with _lock:
+        if not path.exists():
+            IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        index = _load_index()
+        index['titles'][_key(title)] = name
+        index['urls'][_key(image_url)] = name
+        _save_index()
+    return _relative(name)
+
+_IMAGE_REF = re.compile(r'data/images/([A-Za-z0-9._/-]+)')
+
+def referenced_images(json_paths):
+    """Collect image paths (relative to data/images) referenced anywhere in the given JSON files"""
+    names = set()
+    for path in json_paths:
+        try:
+            with open(path, 'r') as f:
+                names.update(_IMAGE_REF.findall(f.read()))
+        except OSError:
+            pass
+    return names
+
+def _published_json():
+    """Every JSON file under data/ that can reference images: news.json, archives, shards"""
+    return [path for path in (REPO_ROOT / 'data').rglob('*.json') if path != INDEX_PATH]
+
+def collect_garbage(json_paths=None):
+    """
+    Delete stored images no longer referenced by published JSON, and drop them from the index.
+
+    json_paths defaults to every JSON file under data/ (other than the index).
+    """
+    keep = referenced_images(json_paths if json_paths is not None else _published_json())
+    removed = 0
+    freed = 0
+    with _lock:
+        for path in IMAGES_DIR.rglob('*'):
+            if path == INDEX_PATH or not path.is_file() or path.relative_to(IMAGES_DIR).as_posix() in keep:
+                continue
+            # Anything we might still be writing is left for the next run
+            if path.name.endswith('.tmp'):
+                continue
+            freed += path.stat().st_size
+            path.unlink()
+            removed += 1
+
+        index = _load_index()
+        for table in ('titles', 'urls'):
+            index[table] = {k: v for k, v in index[table].items() if v in keep}
+        _save_index()
+    print(f"Image GC: removed {removed} unreferenced images ({freed / 1e6:.1f} MB), {len(keep)} in use")
+    return removed
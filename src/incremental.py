@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from dedupe import article_link, canonical_url
+from models import Article
+from publish import load_latest
+
+REPO_ROOT = Path(__file__).parent.parent
+
+def load_previous(path):
+    """Load the previous run's edition, returning (articles by canonical URL, full data)"""
+    data = load_latest(path)
+    articles = {}
+    for article in data.get('articles', []):
+        if article.get('url'):
+            articles[canonical_url(article_link(article))] = Article.from_dict(article)
+    return articles, data
+
+def _is_complete(article, unavailable):
+    """An article can be carried forward if it has a real summary and its image still exists"""
+    summary = article.get('summary')
+    if not summary or summary == unavailable:
+        return False
+    image = article.get('image', '')
+    if not image:
+        return False
+    if image.startswith('data/'):
+        return (REPO_ROOT / image).exists()
+    return True
+
+def split_new(items, previous, unavailable="Summary unavailable."):
+    """
+    Match freshly fetched items against the previous run.
+
+    Items are matched by canonical URL. Returns (merged, new_items): merged
+    holds one slot per input item, with the previous article carried forward
+    where possible and None where the item still needs processing; new_items
+    lists those items in order.
+    """
+    merged = []
+    new_items = []
+    for item in items:
+        old = previous.get(canonical_url(article_link(item)))
+        if old is not None and _is_complete(old, unavailable):
+            merged.append(old)
+        else:
+            merged.append(None)
+            new_items.append(item)
+    return merged, new_items
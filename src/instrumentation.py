@@ -0,0 +1,174 @@
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+REPORT_PATH = REPO_ROOT / 'run_report.json'
+PROFILE_DIR = REPO_ROOT / '.cache' / 'profiles'
+
+# Name of one span to run under cProfile / tracemalloc, e.g. PROFILE_STAGE=stage.enrich
+# (cProfile only sees the thread that entered the span)
+PROFILE_STAGE = os.environ.get('PROFILE_STAGE')
+TRACEMALLOC_STAGE = os.environ.get('TRACEMALLOC_STAGE')
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_sections = {}
+_profiles = {}
+_started = time.time()
+
+# Enclosing span, per thread and per asyncio task
+_current = contextvars.ContextVar('span', default=None)
+
+def incr(name, amount=1):
+    """Add to a named counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def _record(name, parent, seconds, failed):
+    with _lock:
+        span = _spans.get(name)
+        if span is None:
+            span = _spans[name] = {'parent': parent, 'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0, 'samples': []}
+        span['count'] += 1
+        span['errors'] += failed
+        span['total'] += seconds
+        span['max'] = max(span['max'], seconds)
+        span['samples'].append(seconds)
+
+@contextmanager
+def span(name):
+    """
+    Time a block under name. Repeated spans with the same name are
+    aggregated; a block that raises is counted as an error and re-raised.
+    """
+    parent = _current.get()
+    token = _current.set(name)
+    profiler = cProfile.Profile() if name == PROFILE_STAGE else None
+    tracing = name == TRACEMALLOC_STAGE and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler:
+            profiler.disable()
+            _save_profile(name, profiler)
+        if tracing:
+            _save_tracemalloc(name)
+        _current.reset(token)
+        _record(name, parent, elapsed, failed)
+
+def timed(name=None):
+    """Decorator form of span; works on plain and async functions"""
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__name__}"
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def _save_profile(name, profiler):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"{name}.prof"
+    profiler.dump_stats(str(path))
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(20)
+    print(f"Profile of {name} saved to {path}\n{out.getvalue()}")
+    with _lock:
+        _profiles[name] = {'cprofile': str(path.relative_to(REPO_ROOT))}
+
+def _save_tracemalloc(name):
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    top = [
+        {'location': str(stat.traceback[0]), 'bytes': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:15]
+    ]
+    print(f"Peak traced memory in {name}: {peak / 1e6:.1f} MB")
+    with _lock:
+        _profiles.setdefault(name, {})['tracemalloc'] = {'peak_bytes': peak, 'top': top}
+
+def set_section(name, data):
+    """Attach extra structured data (cache stats, provider stats...) to the report"""
+    with _lock:
+        _sections[name] = data
+
+def _percentile(sorted_samples, fraction):
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+def report():
+    with _lock:
+        spans = {}
+        for name, s in _spans.items():
+            samples = sorted(s['samples'])
+            spans[name] = {
+                'parent': s['parent'],
+                'count': s['count'],
+                'errors': s['errors'],
+                'total_s': round(s['total'], 4),
+                'max_s': round(s['max'], 4),
+                'p50_s': round(_percentile(samples, 0.5), 4),
+                'p95_s': round(_percentile(samples, 0.95), 4),
+            }
+        data = {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(_started)),
+            'wall_s': round(time.time() - _started, 3),
+            'spans': spans,
+            'counters': dict(sorted(_counters.items())),
+        }
+        data.update(_sections)
+        if _profiles:
+            data['profiles'] = dict(_profiles)
+    return data
+
+def write_report(path=REPORT_PATH):
+    """Write the run report as JSON (atomically) and return it"""
+    data = report()
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+    print(f"Run report written to {path}")
+    return data
+
+def reset():
+    """Clear everything recorded so far (for running several pipelines in one process)"""
+    global _started
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _sections.clear()
+        _profiles.clear()
+        _started = time.time()
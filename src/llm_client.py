@@ -0,0 +1,247 @@
+import asyncio
+import inspect
+import os
+import re
+import threading
+import time
+
+import rate_limit
+
+# Longest server-requested wait we sit out; anything longer means the quota is gone for this run
+MAX_RETRY_WAIT = 30
+
+# Consecutive failed calls after which a provider is skipped for the rest of the run
+FAILURE_THRESHOLD = 3
+
+# Server errors worth retrying, like connection errors and timeouts
+TRANSIENT_STATUSES = (500, 502, 503, 504)
+
+class Provider:
+    """A long-lived chat client for one LLM provider, with a circuit breaker and usage counters"""
+
+    def __init__(self, name, model, api_key_env, make_client, retries, defaults=None):
+        self.name = name
+        self.model = model
+        self.api_key_env = api_key_env
+        self.make_client = make_client
+        self.retries = retries
+        self.defaults = defaults or {}
+        self.client = None
+        self.open_reason = None  # set when the circuit is open
+        self.not_before = 0.0
+        self.consecutive_failures = 0
+        self.stats = {
+            'requests': 0,
+            'failures': 0,
+            'retries': 0,
+            'latency': 0.0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+        }
+
+    def available(self):
+        if self.open_reason:
+            return False
+        if not os.environ.get(self.api_key_env):
+            self.trip(f"{self.api_key_env} not set")
+            return False
+        return True
+
+    def trip(self, reason):
+        """Open the circuit: stop calling this provider for the rest of the run"""
+        if not self.open_reason:
+            self.open_reason = reason
+            print(f"{self.name}: disabled for this run ({reason})")
+
+    def get_client(self):
+        if self.client is None:
+            self.client = self.make_client(os.environ[self.api_key_env])
+        return self.client
+
+    async def complete(self, messages, json_mode=False, **params):
+        """Return the completion text, or None if this provider could not answer"""
+        request = {'model': self.model, 'messages': messages, **self.defaults}
+        request.update({k: v for k, v in params.items() if v is not None})
+        if json_mode:
+            request['response_format'] = {'type': 'json_object'}
+
+        for attempt in range(self.retries):
+            if not self.available():
+                return None
+            delay = self.not_before - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await rate_limit.BUCKETS[self.name].acquire_async()
+
+            start = time.perf_counter()
+            self.stats['requests'] += 1
+            try:
+                raw = await self.get_client().chat.completions.with_raw_response.create(**request)
+                self._note_limits(raw.headers)
+                completion = raw.parse()
+                if inspect.isawaitable(completion):  # Groq's async raw responses parse asynchronously, OpenAI's don't
+                    completion = await completion
+                # A 200 can still carry a body we can't use (OpenRouter sends "choices": null)
+                content = completion.choices[0].message.content
+                if not content:
+                    raise ValueError("empty completion")
+            except Exception as e:
+                self.stats['latency'] += time.perf_counter() - start
+                self.stats['failures'] += 1
+                wait = self._handle_error(e, attempt)
+                if wait is None:
+                    return None
+                self.stats['retries'] += 1
+                print(f"{self.name} {_describe(e)} (attempt {attempt+1}/{self.retries}), waiting {wait:.1f}s...")
+                await asyncio.sleep(wait)
+                continue
+
+            self.stats['latency'] += time.perf_counter() - start
+            self.consecutive_failures = 0
+            usage = getattr(completion, 'usage', None)
+            if usage:
+                self.stats['prompt_tokens'] += usage.prompt_tokens or 0
+                self.stats['completion_tokens'] += usage.completion_tokens or 0
+            return content
+        return None
+
+    def _handle_error(self, error, attempt):
+        """Decide what to do after a failed call: seconds to wait before retrying, or None to give up"""
+        status = getattr(error, 'status_code', None)
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+
+        if status in (401, 403):
+            self.trip(f"authentication failed ({status})")
+            return None
+        if status == 429:
+            wait = _retry_after(headers)
+            if wait is None:
+                wait = 2 ** attempt  # 1s, 2s, 4s
+            if wait > MAX_RETRY_WAIT:
+                self.trip(f"quota exhausted, resets in {wait:.0f}s")
+                return None
+            if attempt < self.retries - 1:
+                return wait
+            # Still rate limited after every retry: a failed call like any other
+            self._count_failure()
+            return None
+        if (status in TRANSIENT_STATUSES or _is_connection_error(error)) and attempt < self.retries - 1:
+            return 2 ** attempt
+
+        print(f"{self.name} failed: {error}")
+        self._count_failure()
+        return None
+
+    def _count_failure(self):
+        """Count a call that ended in failure, opening the circuit after FAILURE_THRESHOLD in a row"""
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.trip(f"{self.consecutive_failures} consecutive failures")
+
+    def _note_limits(self, headers):
+        """Hold off the next request when the response says the request budget is spent"""
+        if headers.get('x-ratelimit-remaining-requests') == '0':
+            wait = _parse_duration(headers.get('x-ratelimit-reset-requests'))
+            if wait is not None:
+                if wait > MAX_RETRY_WAIT:
+                    self.trip(f"request quota exhausted, resets in {wait:.0f}s")
+                else:
+                    self.not_before = time.monotonic() + wait
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+def _parse_duration(value):
+    """Parse '2', '7.66s', '1m30s' or '250ms' into seconds"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+def _is_connection_error(error):
+    # Both SDKs raise their own APIConnectionError (APITimeoutError is a subclass); match by name
+    return any(cls.__name__ == 'APIConnectionError' for cls in type(error).__mro__)
+
+def _describe(error):
+    status = getattr(error, 'status_code', None)
+    if status == 429:
+        return "rate limited"
+    return f"server error {status}" if status else "connection failed"
+
+def _retry_after(headers):
+    for header in ('retry-after', 'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'):
+        wait = _parse_duration(headers.get(header))
+        if wait is not None:
+            return wait
+    return None
+
+def _make_groq(api_key):
+    from groq import AsyncGroq
+    # Retries are handled here so Retry-After and the circuit breaker apply
+    return AsyncGroq(api_key=api_key, base_url=os.environ.get('GROQ_BASE_URL'), max_retries=0)
+
+def _make_openrouter(api_key):
+    from openai import AsyncOpenAI
+    base_url = os.environ.get('OPENROUTER_BASE_URL', "https://openrouter.ai/api/v1")
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+
+PROVIDERS = {
+    'groq': Provider(
+        'groq', "llama-3.3-70b-versatile", "GROQ_API_KEY", _make_groq, retries=3,
+        defaults={'temperature': 0.5, 'top_p': 1, 'stream': False}
+    ),
+    'openrouter': Provider(
+        'openrouter', "meta-llama/llama-3.1-8b-instruct:free", "OPENROUTER_API_KEY", _make_openrouter, retries=2
+    ),
+}
+
+DEFAULT_ORDER = ('groq', 'openrouter')
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop():
+    """Return the background event loop that owns the provider clients"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='llm-client', daemon=True).start()
+        return _loop
+
+async def achat(messages, providers=DEFAULT_ORDER, **params):
+    """Try each provider in order and return the first completion text, or None"""
+    for name in providers:
+        provider = PROVIDERS[name]
+        if not provider.available():
+            continue
+        content = await provider.complete(messages, **params)
+        if content:
+            return content
+    return None
+
+def chat(messages, providers=DEFAULT_ORDER, **params):
+    """
+    Blocking wrapper around achat, safe to call from any thread.
+
+    All requests share one event loop so clients and their connections are reused.
+    """
+    future = asyncio.run_coroutine_threadsafe(achat(messages, providers, **params), _get_loop())
+    return future.result()
+
+def stats():
+    """Per-provider request, latency and token counters"""
+    report = {}
+    for name, provider in PROVIDERS.items():
+        s = dict(provider.stats)
+        s['avg_latency'] = s['latency'] / s['requests'] if s['requests'] else 0.0
+        s['disabled'] = provider.open_reason
+        report[name] = s
+    return report
@@ -1,116 +1,318 @@
-import json
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-import datetime
 import time
-from scrapers import get_rss_news, get_hacker_news, get_reddit_news, get_arxiv_papers
-from summarizer import summarize_content
+from concurrent.futures import ThreadPoolExecutor
+import checkpoints
+import http_client
+import image_optimizer
+import image_store
+import instrumentation
+import llm_client
+import meta_extractor
+import publish
+import ranking
+import relevance
+import search_index
+from dedupe import article_link, dedupe_articles
+from incremental import load_previous, split_new
+from store import ArticleStore
+from concurrency import bounded_map
+from models import Article
+from scrapers import extract_image, get_rss_news, get_hacker_news, get_reddit_news, get_arxiv_papers
+import summarizer
 from image_generator import ensure_article_has_image
 
-def main():
-    print("Starting AI Daily News aggregation...")
-    
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Overall time budget for the fetch stage, in seconds
+FETCH_DEADLINE = 60
+
+# Articles enriched and published per run; bounds API usage and processing time
+TOP_ARTICLES = 30
+
+def fetch_all_sources(rss_urls, deadline=FETCH_DEADLINE):
+    """
+    Run every source concurrently and merge their items in a fixed order.
+
+    Sources still running when the deadline expires are skipped for this run.
+    """
+    sources = [
+        ('RSS', lambda: get_rss_news(rss_urls)),
+        ('Hacker News', get_hacker_news),
+        ('Reddit', get_reddit_news),
+        ('arXiv', get_arxiv_papers),
+    ]
+
+    def run_source(source):
+        name, fetch = source
+        start = time.perf_counter()
+        with instrumentation.span(f"fetch.{name}"):
+            items = fetch()
+        instrumentation.incr(f"fetch.{name}.items", len(items))
+        print(f"  {name}: {len(items)} items in {time.perf_counter() - start:.2f}s")
+        return items
+
+    print(f"Fetching {len(sources)} sources concurrently (deadline {deadline}s)...")
+    start = time.perf_counter()
+    results = bounded_map(run_source, sources, timeout=deadline)
+
     all_news = []
-    
-    # 1. RSS Feeds
-    rss_urls = [
+    for (name, _), items in zip(sources, results):
+        if items is None:
+            print(f"  {name}: no results (failed or missed the deadline)")
+            continue
+        all_news.extend(items)
+    print(f"Fetch stage finished in {time.perf_counter() - start:.2f}s")
+    return all_news
+
+# Image workers; provider rate limits are enforced by rate_limit buckets
+IMAGE_WORKERS = 4
+
+def build_content_context(item):
+    """Build the title + source + description prompt context for an article"""
+    description = item.get('description', '')
+    context = f"Title: {item['title']}\nSource: {item['source_name'] or item['source']}"
+    if description:
+        context += f"\nDescription: {description}"
+    return context
+
+@instrumentation.timed('image.resolve')
+def _resolve_image(item):
+    try:
+        # HN stories link to arbitrary pages; try their preview image before generating one
+        if not item.get('image') and item.get('source') == 'Hacker News':
+            item['image'] = extract_image(item['url'])
+        return ensure_article_has_image(item)
+    except Exception as e:
+        instrumentation.incr('errors.image_resolve')
+        print(f"Image resolution failed for {item['title']}: {e}")
+        item['image'] = "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=450&fit=crop"
+        return item
+
+def _summarize_all(items):
+    try:
+        return summarizer.summarize_many([(item['url'], build_content_context(item)) for item in items])
+    except Exception as e:
+        instrumentation.incr('errors.summarize')
+        print(f"Failed to summarize articles: {e}")
+        return [summarizer.SUMMARY_UNAVAILABLE] * len(items)
+
+def process_articles(items):
+    """
+    Resolve images in a worker pool while summaries are produced in batches alongside.
+
+    Results keep the input order so news.json stays deterministic.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as image_pool, \
+         ThreadPoolExecutor(max_workers=1) as summary_pool:
+        summary_future = summary_pool.submit(_summarize_all, items)
+        image_futures = [image_pool.submit(_resolve_image, item) for item in items]
+
+        final_news = [future.result() for future in image_futures]
+        for item, summary in zip(final_news, summary_future.result()):
+            item['summary'] = summary or summarizer.SUMMARY_UNAVAILABLE
+
+    print(f"Processed {len(final_news)} articles in {time.perf_counter() - start:.2f}s")
+    return final_news
+
+# Pipeline stages in order; each one's output is checkpointed before the next starts
+STAGES = ('fetch', 'dedupe', 'enrich', 'podcast', 'publish')
+
+def _dicts(articles):
+    return [article.to_dict() for article in articles]
+
+def _articles(dicts):
+    return [Article.from_dict(article) for article in dicts]
+
+def run_fetch():
+    # RSS_FEEDS (comma-separated) replaces the default feed list, e.g. for bench/
+    rss_urls = [url for url in os.environ.get('RSS_FEEDS', '').split(',') if url] or [
         'https://openai.com/blog/rss.xml',
         'https://deepmind.google/blog/rss.xml',
         'https://huggingface.co/blog/feed.xml'
     ]
-    print("Fetching RSS feeds...")
-    all_news.extend(get_rss_news(rss_urls))
-    
-    # 2. Hacker News
-    print("Fetching Hacker News...")
-    all_news.extend(get_hacker_news())
-    
-    # 3. Reddit
-    print("Fetching Reddit...")
-    all_news.extend(get_reddit_news())
-    
-    # 4. arXiv
-    print("Fetching arXiv...")
-    all_news.extend(get_arxiv_papers())
-    
-    print(f"Collected {len(all_news)} items. Deduplicating...")
-    
-    # Deduplicate by URL
-    seen_urls = set()
-    unique_news = []
-    for item in all_news:
-        if item['url'] not in seen_urls:
-            seen_urls.add(item['url'])
-            unique_news.append(item)
-            
-    print(f"Unique items: {len(unique_news)}. Processing up to 30 articles...")
-
-    # Limit to 30 to avoid API rate limits and keep processing time reasonable
-    articles_to_process = min(30, len(unique_news))
-    
-    final_news = []
-    for i, item in enumerate(unique_news[:articles_to_process]):
-        print(f"Processing {i+1}/{articles_to_process}: {item['title']}")
-        
-        try:
-            # Ensure article has an image
-            item = ensure_article_has_image(item)
-
-            # Generate summary using title + description for richer context
-            description = item.get('description', '')
-            if description:
-                content_context = f"Title: {item['title']}\nSource: {item['source_name'] or item['source']}\nDescription: {description}"
-            else:
-                content_context = f"Title: {item['title']}\nSource: {item['source_name'] or item['source']}"
-            summary = summarize_content(content_context)
-            item['summary'] = summary
-            final_news.append(item)
-            
-        except Exception as e:
-            print(f"Failed to process {item['title']}: {e}")
-            # Still add the article with basic info
-            item['summary'] = "Summary unavailable."
-            item = ensure_article_has_image(item)  # Ensure image even on error
-            final_news.append(item)
-            
-        # Add delay to avoid rate limits on image fetching
-        time.sleep(2)
-            
-    # Save to data/news.json
-    output_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'news.json')
-    
-    # Generate podcast
+    with instrumentation.span('stage.fetch'):
+        all_news = fetch_all_sources(rss_urls)
+    print(f"Collected {len(all_news)} items.")
+    return {'articles': _dicts(all_news)}
+
+def run_dedupe(fetched, history):
+    all_news = _articles(fetched['articles'])
+    print(f"Deduplicating {len(all_news)} items...")
+    # Merge the same story seen in several sources, by canonical URL and near-duplicate title
+    with instrumentation.span('stage.dedupe'):
+        unique_news = dedupe_articles(all_news)
+        # Hacker News is already filtered by relevance; the topical sources pass but get scored too
+        relevance.annotate(unique_news)
+        # Every sighting goes into the history store, enriched or not
+        history.upsert_articles(unique_news)
+    print(f"Unique items: {len(unique_news)}")
+    return {'articles': _dicts(unique_news)}
+
+def run_enrich(deduped, history, incremental):
+    unique_news = _articles(deduped['articles'])
+    print(f"Selecting the top {TOP_ARTICLES}...")
+
+    previous, previous_data = load_previous(str(publish.INDEX_PATH)) if incremental else ({}, {})
+
+    # Rank before enrichment so image and LLM work stays fixed however many items were fetched
+    with instrumentation.span('stage.rank'):
+        candidates = ranking.select_top(unique_news, TOP_ARTICLES)
+    if incremental:
+        # Articles enriched in any earlier run can be reused, not just those in the last edition
+        for key, article in history.get_articles(article_link(item) for item in candidates).items():
+            previous.setdefault(key, article)
+    merged, new_items = split_new(candidates, previous, summarizer.SUMMARY_UNAVAILABLE)
+    print(f"Reusing {len(candidates) - len(new_items)} articles from the previous run, processing {len(new_items)} new")
+
+    instrumentation.incr('articles.reused', len(candidates) - len(new_items))
+    instrumentation.incr('articles.processed', len(new_items))
+
+    with instrumentation.span('stage.enrich'):
+        processed = iter(process_articles(new_items))
+    final_news = [old if old is not None else next(processed) for old in merged]
+    with instrumentation.span('stage.optimize_images'):
+        image_optimizer.optimize_articles(final_news)
+    history.upsert_articles(final_news, summarizer.SUMMARY_UNAVAILABLE)
+    return {
+        'articles': _dicts(final_news),
+        # The day's shard lists the last run's articles first, then earlier runs' ones
+        'unchanged': bool(previous_data) and final_news == previous_data.get('articles', [])[:len(final_news)],
+        'previous_podcast': previous_data.get('podcast'),
+    }
+
+def run_podcast(enriched, history):
+    previous_podcast = enriched['previous_podcast']
+    if enriched['unchanged'] and previous_podcast and os.path.exists(os.path.join(REPO_ROOT, previous_podcast['file'])):
+        print("\nArticles unchanged since the last run, keeping the existing podcast")
+        return {'podcast': previous_podcast}
+
     print("\nGenerating daily podcast...")
     podcast_metadata = None
     try:
-        # Import from same directory
-        import sys
-        sys.path.insert(0, os.path.dirname(__file__))
+        # Imported here so the other stages never load the TTS client
         import podcast_generator
-        podcast_metadata = podcast_generator.create_podcast(final_news)
+        with instrumentation.span('stage.podcast'):
+            podcast_metadata = podcast_generator.create_podcast(_articles(enriched['articles']))
+        if podcast_metadata:
+            history.add_episode(podcast_metadata['date'], podcast_metadata)
     except Exception as e:
+        instrumentation.incr('errors.podcast')
         print(f"Podcast generation failed: {e}")
         import traceback
         traceback.print_exc()
-    
-    # Save news data with podcast metadata
-    news_data = {
-        'updated': datetime.datetime.now().isoformat(),
-        'articles': final_news
-    }
-    
-    if podcast_metadata:
-        news_data['podcast'] = podcast_metadata
-    
-    with open(output_path, 'w') as f:
-        json.dump(news_data, f, indent=2)
-        
-    print(f"\nDone! Saved {len(final_news)} articles to {output_path}")
+    # Publishing goes ahead without an episode, but the stage is left incomplete so a rerun retries it
+    return {'podcast': podcast_metadata, 'failed': podcast_metadata is None}
+
+def run_publish(enriched, podcasted):
+    output_path = str(publish.INDEX_PATH)
+    podcast_metadata = podcasted['podcast']
+    if enriched['unchanged'] and podcast_metadata == enriched['previous_podcast']:
+        print(f"\nNothing changed, leaving {output_path} as is")
+    else:
+        # Index plus a content-addressed daily shard, each with .gz/.br siblings
+        with instrumentation.span('stage.publish'):
+            publish.publish(enriched['articles'], podcast_metadata)
+            search_index.build()
+    image_store.collect_garbage()
+    print(f"\nDone! Saved {len(enriched['articles'])} articles to {output_path}")
     if podcast_metadata:
         print(f"Podcast generated: {podcast_metadata['file']} (~{podcast_metadata['duration']}s)")
+    return {'published': True}
+
+def report_caches(history):
+    """Persist and prune caches, then print and record their stats"""
+    meta_extractor.get_cache().save()
+    http_client.prune_cache()
+    for name, s in llm_client.stats().items():
+        print(f"LLM {name}: {s['requests']} requests, {s['failures']} failures, "
+              f"{s['avg_latency']:.2f}s avg latency, {s['prompt_tokens']}+{s['completion_tokens']} tokens"
+              + (f" (disabled: {s['disabled']})" if s['disabled'] else ""))
+    summary_cache = summarizer.get_cache()
+    summary_cache.prune()
+    cache_stats = summary_cache.stats()
+    print(f"Summary cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} stored)")
+    print(f"History store: {', '.join(f'{count} {table}' for table, count in history.stats().items())}")
+    instrumentation.set_section('llm', llm_client.stats())
+    instrumentation.set_section('caches', {
+        'http': dict(http_client.stats),
+        'summaries': cache_stats,
+        'history': history.stats(),
+    })
+    print(f"HTTP cache: {http_client.stats['hits']} hits, {http_client.stats['revalidated']} revalidated, {http_client.stats['misses']} misses")
+
+def main(incremental=True, start=None, only=None, restart=False):
+    """
+    Run the pipeline stages, checkpointing each one's output.
+
+    By default an unfinished recent run with the same options is resumed
+    after its last completed stage, otherwise a new run starts from fetch.
+    start reruns from that stage on, and only runs that single stage, both
+    reading earlier stages' output from their checkpoints; such partial
+    runs are never resumed. A failed podcast stage doesn't stop publishing,
+    but leaves the run unfinished so the next run retries it.
+    """
+    print("Starting AI Daily News aggregation...")
+    options = {'incremental': incremental}
+    if (start or only) and STAGES.index(start or only) > 0:
+        first = STAGES.index(start or only)
+        checkpoints.rewind(STAGES[:first], options)
+    else:
+        run = None if restart or start or only else checkpoints.resumable(options)
+        if run:
+            first = next((i for i, stage in enumerate(STAGES) if stage not in run['completed']), len(STAGES))
+            if first < len(STAGES):
+                print(f"Resuming the unfinished run from the {STAGES[first]} stage")
+        else:
+            checkpoints.start_run(options, partial=bool(start or only))
+            first = 0
+    last = first if only else len(STAGES) - 1
+
+    history = ArticleStore()
+    outputs = {}
+
+    def output(stage):
+        if stage not in outputs:
+            outputs[stage] = checkpoints.load(stage)
+            if outputs[stage] is None:
+                raise SystemExit(f"No checkpoint for the {stage} stage; run it first")
+        return outputs[stage]
+
+    runners = {
+        'fetch': run_fetch,
+        'dedupe': lambda: run_dedupe(output('fetch'), history),
+        'enrich': lambda: run_enrich(output('dedupe'), history, incremental),
+        'podcast': lambda: run_podcast(output('enrich'), history),
+        'publish': lambda: run_publish(output('enrich'), output('podcast')),
+    }
+    for stage in STAGES[first:last + 1]:
+        outputs[stage] = runners[stage]()
+        if outputs[stage].get('failed'):
+            print(f"The {stage} stage failed; rerunning will resume from it")
+            continue
+        checkpoints.save(stage, outputs[stage])
+    run = checkpoints.current_run()
+    if last == len(STAGES) - 1 and all(stage in run['completed'] for stage in STAGES):
+        checkpoints.finish_run()
+
+    report_caches(history)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Aggregate, summarize and publish AI news")
+    parser.add_argument('--full', action='store_true', help="reprocess every article instead of reusing the previous run")
+    parser.add_argument('--restart', action='store_true', help="start a new run even if the last one did not finish")
+    stages = parser.add_mutually_exclusive_group()
+    stages.add_argument('--from', dest='start', choices=STAGES, help="rerun from this stage, using earlier checkpoints")
+    stages.add_argument('--only', choices=STAGES, help="run just this stage, using earlier checkpoints")
+    args = parser.parse_args()
+    try:
+        main(incremental=not args.full, start=args.start, only=args.only, restart=args.restart)
+    finally:
+        # Written even when the run fails, so the report shows how far it got
+        instrumentation.write_report()
@@ -0,0 +1,140 @@
+import codecs
+import json
+import os
+import threading
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin
+
+import http_client
+import instrumentation
+
+CACHE_PATH = Path(__file__).parent.parent / '.cache' / 'og_images.json'
+
+# How long a found image, or the lack of one, is trusted before the page is checked again
+POSITIVE_TTL = 7 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+
+# Stop reading a page after this many bytes even if </head> hasn't appeared
+MAX_HEAD_BYTES = 256 * 1024
+
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Meta tags holding a preview image, best first
+IMAGE_META_KEYS = ['og:image', 'og:image:secure_url', 'og:image:url', 'twitter:image', 'twitter:image:src', 'article:image']
+
+class _EndOfHead(Exception):
+    pass
+
+class HeadMetaParser(HTMLParser):
+    """Collect every <meta property/name=... content=...> in one pass, stopping at the end of <head>"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            raise _EndOfHead()
+        if tag != 'meta':
+            return
+        attrs = dict(attrs)
+        key = (attrs.get('property') or attrs.get('name') or '').strip().lower()
+        content = (attrs.get('content') or '').strip()
+        if key and content and key not in self.meta:
+            self.meta[key] = content
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            raise _EndOfHead()
+
+def best_image(meta, base_url):
+    """Pick the preferred preview image from collected meta tags, as an absolute URL"""
+    for key in IMAGE_META_KEYS:
+        if meta.get(key):
+            return urljoin(base_url, meta[key])
+    return ""
+
+def fetch_head_meta(url, timeout=3, max_bytes=MAX_HEAD_BYTES):
+    """
+    Stream a page and return its <head> meta tags without downloading the rest.
+
+    Returns (meta dict, final URL), or (None, url) for non-HTML responses and
+    HTTP errors.
+    """
+    response = http_client.get(url, timeout=timeout, stream=True, allow_redirects=True)
+    try:
+        if response.status_code != 200:
+            return None, url
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type and content_type not in HTML_TYPES:
+            return None, url
+
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        parser = HeadMetaParser()
+        read = 0
+        try:
+            for chunk in response.iter_content(chunk_size=8192):
+                read += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if read >= max_bytes:
+                    break
+        except _EndOfHead:
+            pass
+        instrumentation.incr('http.bytes_received', read)
+        return parser.meta, response.url or url
+    finally:
+        response.close()
+
+class ImageResultCache:
+    """Persistent URL -> preview image map, including pages known to have none"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, url):
+        """Return the cached image ('' for a cached miss), or None if unknown or expired"""
+        with self.lock:
+            entry = self.entries.get(url)
+        if entry is None:
+            return None
+        ttl = POSITIVE_TTL if entry['image'] else NEGATIVE_TTL
+        if time.time() - entry['checked_at'] > ttl:
+            return None
+        return entry['image']
+
+    def put(self, url, image):
+        with self.lock:
+            self.entries[url] = {'image': image, 'checked_at': time.time()}
+
+    def save(self):
+        """Write the cache to disk, dropping expired entries"""
+        now = time.time()
+        with self.lock:
+            self.entries = {
+                url: entry for url, entry in self.entries.items()
+                if now - entry['checked_at'] <= (POSITIVE_TTL if entry['image'] else NEGATIVE_TTL)
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared URL -> image result cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageResultCache()
+        return _cache
@@ -0,0 +1,125 @@
+import calendar
+import datetime
+import email.utils
+import time
+from dataclasses import dataclass, field, fields
+
+def parse_date(value):
+    """
+    Parse a feed or API date into epoch seconds, or None if it isn't recognised.
+
+    Accepts epoch numbers, time.struct_time (as from feedparser's *_parsed
+    fields, which are UTC), ISO 8601 (with or without offset; naive values are
+    taken as UTC) and RFC 822 strings.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, time.struct_time):
+        return calendar.timegm(value)
+    value = value.strip()
+    # ISO first: it's what most sources send and fromisoformat is implemented in C
+    if value[:4].isdigit():
+        try:
+            parsed = datetime.datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+        except ValueError:
+            pass
+        else:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+            return int(parsed.timestamp())
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return int(email.utils.mktime_tz(parsed))
+
+def format_timestamp(ts):
+    """Epoch seconds as a compact UTC ISO 8601 string"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))
+
+@dataclass(slots=True, eq=False)
+class Article:
+    """
+    One news item, from ingest to news.json.
+
+    Supports the dict-style access the pipeline grew up with (item['title'],
+    item.get('summary'), 'score' in item). Optional fields that are None
+    count as absent and are left out of to_dict().
+    """
+    source: str
+    source_name: str
+    title: str
+    url: str
+    published_ts: int = 0
+    description: str = ''
+    image: str = ''
+    link_url: str = None
+    score: int = None
+    comments: int = None
+    relevance: float = None
+    sources: list = None
+    summary: str = None
+    image_meta: dict = None
+    published: str = field(init=False, default='')
+
+    def __post_init__(self):
+        self.published = format_timestamp(self.published_ts)
+
+    @classmethod
+    def create(cls, source, source_name, title, url, published=None, **kwargs):
+        """Build an article, normalising any supported date format (missing means now)"""
+        ts = parse_date(published)
+        return cls(source, source_name, title, url, published_ts=int(time.time()) if ts is None else ts, **kwargs)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an article from to_dict() output, ignoring unknown keys"""
+        kwargs = {name: data[name] for name in _INIT_FIELDS if name in data}
+        if 'published_ts' not in kwargs:
+            kwargs['published_ts'] = parse_date(data.get('published')) or 0
+        return cls(**kwargs)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in _FIELDS if getattr(self, name) is not None}
+
+    def copy(self):
+        return Article.from_dict(self.to_dict())
+
+    def __getitem__(self, key):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        if key in ('published', 'published_ts'):
+            # Keep the two date fields in step
+            self.published_ts = parse_date(value) or 0
+            self.published = format_timestamp(self.published_ts)
+        else:
+            setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in _FIELDS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in _FIELDS else None
+        return default if value is None else value
+
+    def keys(self):
+        return [name for name in _FIELDS if getattr(self, name) is not None]
+
+    def __eq__(self, other):
+        if isinstance(other, Article):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+# Output order in news.json: identity first, then dates and enrichment
+_FIELDS = ('source', 'source_name', 'title', 'url', 'link_url', 'published', 'published_ts', 'description',
+           'summary', 'image', 'image_meta', 'score', 'comments', 'relevance', 'sources')
+_INIT_FIELDS = tuple(f.name for f in fields(Article) if f.init)
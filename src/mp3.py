@@ -0,0 +1,186 @@
+# Minimal MPEG audio (Layer III) frame parsing: enough to concatenate MP3
+# streams frame by frame, generate silence and measure duration without
+# decoding any audio.
+
+import mmap
+import os
+
+# Bitrates in kbps indexed by the header's 4-bit bitrate index
+BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],  # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],      # MPEG-2 / 2.5
+}
+
+SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    2.5: [11025, 12000, 8000],
+}
+
+_VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+
+class FrameHeader:
+    __slots__ = ('raw', 'version', 'bitrate', 'sample_rate', 'padding', 'mono', 'length', 'samples')
+
+    def __init__(self, raw, version, bitrate, sample_rate, padding, mono):
+        self.raw = raw
+        self.version = version
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.padding = padding
+        self.mono = mono
+        coefficient = 144 if version == 1 else 72
+        self.length = coefficient * bitrate * 1000 // sample_rate + padding
+        self.samples = 1152 if version == 1 else 576
+
+    @property
+    def duration(self):
+        """Seconds of audio in this frame"""
+        return self.samples / self.sample_rate
+
+    @property
+    def side_info_length(self):
+        if self.version == 1:
+            return 17 if self.mono else 32
+        return 9 if self.mono else 17
+
+def parse_header(data, offset=0):
+    """Parse the 4-byte Layer III frame header at offset, or return None if there isn't one"""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = _VERSIONS.get((b1 >> 3) & 0b11)
+    layer = (b1 >> 1) & 0b11
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0b11
+    if version is None or layer != 0b01 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = BITRATES[1 if version == 1 else 2][bitrate_index]
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    mono = (b3 >> 6) == 0b11
+    return FrameHeader(bytes(data[offset:offset + 4]), version, bitrate, sample_rate, padding, mono)
+
+def skip_id3v2(data):
+    """Return the offset just past a leading ID3v2 tag (0 if there is none)"""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+def _is_info_frame(data, offset, header):
+    """Xing/Info/VBRI frames carry encoder metadata, not audio"""
+    tag_at = offset + 4 + header.side_info_length
+    return (data[tag_at:tag_at + 4] in (b'Xing', b'Info')
+            or data[offset + 36:offset + 40] == b'VBRI')
+
+def iter_frames(data, offset=None):
+    """
+    Yield (offset, header) for each audio frame in data.
+
+    Tags, encoder info frames and junk between frames are skipped. Works on
+    bytes, bytearrays and mmap objects alike.
+    """
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    pos = skip_id3v2(data) if offset is None else offset
+    first = True
+    while pos + 4 <= end:
+        header = parse_header(data, pos)
+        if header is None or pos + header.length > end:
+            pos += 1
+            continue
+        if not (first and _is_info_frame(data, pos, header)):
+            yield pos, header
+        first = False
+        pos += header.length
+
+def silence_frame(header):
+    """
+    Build one silent frame matching header's format.
+
+    With CRC off and all side info zeroed, the frame carries no main data and
+    decodes to silence.
+    """
+    b0, b1, b2, b3 = header.raw
+    b1 |= 0x01            # protection bit set: no CRC
+    b2 &= ~0x02 & 0xFF    # no padding
+    length = (144 if header.version == 1 else 72) * header.bitrate * 1000 // header.sample_rate
+    return bytes([b0, b1, b2, b3]) + bytes(length - 4)
+
+def write_frames(out, data):
+    """
+    Copy the audio frames of an MP3 byte string to out, dropping tags and info frames.
+
+    Returns (first frame header or None, seconds written).
+    """
+    first = None
+    duration = 0.0
+    for offset, header in iter_frames(data):
+        if first is None:
+            first = header
+        out.write(data[offset:offset + header.length])
+        duration += header.duration
+    return first, duration
+
+def write_silence(out, header, seconds):
+    """Write about `seconds` of silence in header's format; returns the exact seconds written"""
+    frame = silence_frame(header)
+    count = max(1, round(seconds / header.duration))
+    out.write(frame * count)
+    return count * header.duration
+
+def scan_duration(path):
+    """
+    Exact duration in seconds of an MP3 file, summed from its frame headers.
+
+    The file is memory-mapped and walked once, frame to frame, without decoding.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0.0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return sum(header.duration for _, header in iter_frames(data))
+
+def _syncsafe(n):
+    return bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+
+def _id3_frame(frame_id, payload):
+    return frame_id.encode() + _syncsafe(len(payload)) + b'\x00\x00' + payload
+
+def _text_frame(frame_id, text):
+    return _id3_frame(frame_id, b'\x03' + text.encode('utf-8'))  # 0x03 = UTF-8
+
+def chapter_tag(chapters, title=None):
+    """
+    Build an ID3v2.4 tag with a CTOC table of contents and one CHAP frame per chapter.
+
+    chapters is a list of dicts with 'start' and 'end' (seconds) and 'title'.
+    """
+    frames = []
+    if title:
+        frames.append(_text_frame('TIT2', title))
+
+    chapters = chapters[:255]  # CTOC entry count is a single byte
+    ids = [f"ch{i}".encode() for i in range(len(chapters))]
+    frames.append(_id3_frame(
+        'CTOC',
+        b'toc\x00' + b'\x03' + bytes([len(ids)]) + b''.join(i + b'\x00' for i in ids)
+    ))
+    for element_id, chapter in zip(ids, chapters):
+        start_ms = int(round(chapter['start'] * 1000))
+        end_ms = int(round(chapter['end'] * 1000))
+        frames.append(_id3_frame(
+            'CHAP',
+            element_id + b'\x00'
+            + start_ms.to_bytes(4, 'big') + end_ms.to_bytes(4, 'big')
+            + b'\xff\xff\xff\xff' * 2  # byte offsets unused; times are authoritative
+            + _text_frame('TIT2', chapter['title'])
+        ))
+
+    body = b''.join(frames)
+    return b'ID3\x04\x00\x00' + _syncsafe(len(body)) + body
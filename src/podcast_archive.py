@@ -0,0 +1,160 @@
+import datetime
+import email.utils
+import hashlib
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+PODCAST_DIR = Path(__file__).parent.parent / 'data' / 'podcast'
+EPISODES_DIR = PODCAST_DIR / 'episodes'
+ARCHIVE_DIR = PODCAST_DIR / 'archive'
+LATEST_PATH = PODCAST_DIR / 'latest.mp3'
+FEED_PATH = PODCAST_DIR / 'feed.xml'
+
+# Days of archived episodes (and feed entries) kept
+RETENTION_DAYS = 30
+
+SITE_URL = os.environ.get('SITE_URL', 'https://salmandshaikh.github.io/ai-daily-news').rstrip('/')
+
+ITUNES_NS = 'http://www.itunes.com/dtds/podcast-1.0.dtd'
+ET.register_namespace('itunes', ITUNES_NS)
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _link(src, dst):
+    """Atomically point dst at src's content, by hardlink where the filesystem allows it"""
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    tmp = dst.with_name(f"{dst.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+def store_episode(audio_path):
+    """Move a rendered episode into the content-addressed store, returning its stored path"""
+    EPISODES_DIR.mkdir(parents=True, exist_ok=True)
+    stored = EPISODES_DIR / f"{_file_hash(audio_path)[:16]}.mp3"
+    if stored.exists():
+        Path(audio_path).unlink()
+    else:
+        os.replace(audio_path, stored)
+    return stored
+
+def apply_retention(today, days=RETENTION_DAYS):
+    """Drop archive entries older than the retention window and episodes nothing links to any more"""
+    cutoff = (datetime.date.fromisoformat(today) - datetime.timedelta(days=days)).isoformat()
+    for path in ARCHIVE_DIR.glob('*.mp3'):
+        if path.stem < cutoff:
+            path.unlink()
+
+    linked = set()
+    copied = set()
+    for path in [LATEST_PATH, *ARCHIVE_DIR.glob('*.mp3')]:
+        if path.exists():
+            st = path.stat()
+            linked.add((st.st_dev, st.st_ino))
+            if st.st_nlink == 1:  # a copy rather than a hardlink; match it by content
+                copied.add(_file_hash(path)[:16])
+
+    removed = 0
+    for path in EPISODES_DIR.glob('*.mp3'):
+        st = path.stat()
+        if (st.st_dev, st.st_ino) not in linked and path.stem not in copied:
+            path.unlink()
+            removed += 1
+    if removed:
+        print(f"Podcast archive: removed {removed} superseded or expired episodes")
+    return cutoff
+
+def _text(parent, tag, text, **attrib):
+    element = ET.SubElement(parent, tag, attrib)
+    element.text = text
+    return element
+
+def _new_feed():
+    rss = ET.Element('rss', {'version': '2.0'})
+    channel = ET.SubElement(rss, 'channel')
+    _text(channel, 'title', 'AI Daily News Podcast')
+    _text(channel, 'link', SITE_URL + '/')
+    _text(channel, 'description', "A short conversation about the day's AI news.")
+    _text(channel, 'language', 'en-us')
+    _text(channel, f'{{{ITUNES_NS}}}author', 'AI Daily News')
+    _text(channel, f'{{{ITUNES_NS}}}explicit', 'false')
+    return ET.ElementTree(rss)
+
+def update_feed(date, episode_path, duration, description, cutoff):
+    """
+    Add or refresh this date's item in the podcast RSS feed, leaving other items untouched.
+
+    Items are keyed by date; a rerun on the same day replaces that day's item
+    in place. Items older than the retention cutoff are dropped.
+    """
+    try:
+        tree = ET.parse(FEED_PATH)
+    except (OSError, ET.ParseError):
+        tree = _new_feed()
+    channel = tree.getroot().find('channel')
+
+    guid = f"ai-daily-news-{date}"
+    url = f"{SITE_URL}/data/podcast/episodes/{episode_path.name}"
+    existing = {item.findtext('guid'): item for item in channel.findall('item')}
+
+    item = existing.get(guid)
+    if item is not None and item.find('enclosure').get('url') == url:
+        changed = False
+    else:
+        changed = True
+        if item is not None:
+            channel.remove(item)
+        item = ET.Element('item')
+        _text(item, 'title', f"AI Daily News - {date}")
+        _text(item, 'guid', guid, isPermaLink='false')
+        _text(item, 'pubDate', email.utils.format_datetime(datetime.datetime.now(datetime.timezone.utc)))
+        _text(item, 'description', description)
+        ET.SubElement(item, 'enclosure', {
+            'url': url,
+            'length': str(episode_path.stat().st_size),
+            'type': 'audio/mpeg',
+        })
+        _text(item, f'{{{ITUNES_NS}}}duration', str(int(round(duration))))
+        # Newest first: insert before the first existing item
+        items = channel.findall('item')
+        position = list(channel).index(items[0]) if items else len(channel)
+        channel.insert(position, item)
+
+    for other in channel.findall('item'):
+        other_guid = other.findtext('guid') or ''
+        if other_guid.startswith('ai-daily-news-') and other_guid[len('ai-daily-news-'):] < cutoff:
+            channel.remove(other)
+            changed = True
+
+    if changed:
+        ET.indent(tree)
+        tmp = FEED_PATH.with_name('feed.xml.tmp')
+        tree.write(tmp, encoding='utf-8', xml_declaration=True)
+        os.replace(tmp, FEED_PATH)
+        print(f"Podcast feed updated: {FEED_PATH}")
+
+def publish_episode(audio_path, date, duration, description=""):
+    """
+    Publish a rendered episode: store it by content, link latest and the
+    day's archive entry to it, apply retention and update the feed.
+
+    Returns the stored episode path.
+    """
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    episode = store_episode(audio_path)
+    _link(episode, LATEST_PATH)
+    _link(episode, ARCHIVE_DIR / f"{date}.mp3")
+    cutoff = apply_retention(date)
+    update_feed(date, episode, duration, description, cutoff)
+    return episode
@@ -1,15 +1,33 @@
-import os
 import json
 import asyncio
+import os
+import shutil
+import instrumentation
+import podcast_archive
 from datetime import datetime
 from pathlib import Path
-import edge_tts
-from groq import Groq
+import http_client
+import llm_client
+import mp3
+import tts_cache
 
 # Voice configuration for two speakers
 VOICE_ALEX = "en-US-GuyNeural"      # Male voice
 VOICE_JORDAN = "en-US-JennyNeural"  # Female voice
 
+# Edge TTS prosody settings; part of the segment cache key
+TTS_SETTINGS = {"rate": "+0%", "volume": "+0%", "pitch": "+0Hz"}
+
+# Segments synthesized at once
+TTS_CONCURRENCY = 4
+
+# HTTP endpoint returning MP3 for ?voice=&text=, used instead of Edge TTS when set (see bench/)
+TTS_URL = os.environ.get('TTS_URL')
+
+# Silence between speakers
+PAUSE_SECONDS = 0.5
+
+@instrumentation.timed('podcast.script')
 def generate_podcast_script(articles):
     """
     Generate a conversational podcast script between two journalists
@@ -46,21 +64,16 @@ ALEX: [follow-up]
 Start with a brief intro and end with a sign-off. Make it sound natural and engaging!"""
 
     try:
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        if not groq_api_key:
-            raise ValueError("GROQ_API_KEY not set")
-        client = Groq(api_key=groq_api_key)
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        script = llm_client.chat(
+            [
                 {"role": "system", "content": "You are a professional podcast script writer specializing in tech news."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.8,
             max_tokens=800
         )
-        
-        script = response.choices[0].message.content
+        if not script:
+            raise ValueError("no LLM provider returned a script")
         return script
     
     except Exception as e:
@@ -95,88 +108,104 @@ def parse_script(script):
     
     return segments
 
-async def generate_audio_segment(text, voice, output_path):
+async def synthesize_segment(text, voice, cache=None):
     """
-    Generate audio for a single text segment using Edge TTS.
+    Synthesize a single text segment with Edge TTS, returning the MP3 bytes.
+    Segments already in the cache are returned without calling the service.
     """
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(output_path)
+    key = tts_cache.make_key(voice, text, TTS_SETTINGS)
+    if cache is not None:
+        audio = cache.get(key)
+        if audio is not None:
+            return audio
+
+    with instrumentation.span('podcast.tts_segment'):
+        if TTS_URL:
+            response = await asyncio.to_thread(
+                http_client.get, TTS_URL, params={'voice': voice, 'text': text}, timeout=60, cache=False
+            )
+            response.raise_for_status()
+            audio = response.content
+        else:
+            import edge_tts
+            communicate = edge_tts.Communicate(text, voice, **TTS_SETTINGS)
+            audio = bytearray()
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    audio.extend(chunk["data"])
+            audio = bytes(audio)
+    instrumentation.incr('podcast.tts_bytes', len(audio))
 
-async def combine_audio_segments(segments, output_path):
+    if cache is not None and audio:
+        cache.put(key, audio)
+    return audio
+
+async def combine_audio_segments(segments, output_path, title=None):
     """
-    Generate audio for each segment and combine them into a single file.
+    Synthesize all segments concurrently and stream them into a single MP3.
+
+    Segments are joined frame by frame with generated silent frames between
+    speakers, so nothing is decoded or re-encoded. The file starts with an
+    ID3 tag holding one chapter per segment. Returns (duration, chapters).
     """
-    temp_dir = Path(output_path).parent / "temp"
-    temp_dir.mkdir(exist_ok=True)
-    
-    temp_files = []
-    
-    # Generate audio for each segment
-    for i, (speaker, text) in enumerate(segments):
+    semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+    cache = tts_cache.TTSCache()
+
+    async def synthesize(speaker, text):
         voice = VOICE_ALEX if speaker == "ALEX" else VOICE_JORDAN
-        temp_file = temp_dir / f"segment_{i:03d}.mp3"
-        
-        print(f"Generating audio for {speaker}: {text[:50]}...")
-        await generate_audio_segment(text, voice, str(temp_file))
-        temp_files.append(temp_file)
-    
-    # Combine all segments using ffmpeg (if available) or just use the first/concatenate
-    # For simplicity, we'll use edge_tts's built-in concatenation
-    # by creating one large text with SSML breaks
-    
-    # Alternative: Create combined script with pauses
-    combined_script = []
-    for speaker, text in segments:
-        voice_tag = "male" if speaker == "ALEX" else "female"
-        combined_script.append(text)
-        combined_script.append("<break time='500ms'/>")  # Pause between speakers
-    
-    full_text = " ".join(combined_script)
-    
-    # Generate final audio (using first speaker's voice for now, will improve)
-    # Better approach: concatenate the temp files
-    # Combine all segments
-    try:
-        # Try to use pydub if available and working (requires ffmpeg)
-        from pydub import AudioSegment
-        
-        combined = AudioSegment.empty()
-        silence = AudioSegment.silent(duration=500) # 500ms pause between speakers
-        
-        print(f"Combining {len(temp_files)} segments using pydub...")
-        for i, temp_file in enumerate(temp_files):
-            segment = AudioSegment.from_mp3(str(temp_file))
-            combined += segment
-            
-            # Add pause between segments (but not after the last one)
-            if i < len(temp_files) - 1:
-                combined += silence
-        
-        combined.export(output_path, format="mp3")
-        print(f"Combined audio saved to {output_path}")
-        
-    except (ImportError, Exception) as e:
-        print(f"Audio processing with pydub failed ({e}). Using binary concatenation fallback.")
-        
-        # Fallback: Binary concatenation of MP3 files
-        # This works surprisingly well for MP3s even without re-encoding
-        with open(output_path, 'wb') as outfile:
-            for i, temp_file in enumerate(temp_files):
-                with open(temp_file, 'rb') as infile:
-                    outfile.write(infile.read())
-        
-        print(f"Combined audio (binary concat) saved to {output_path}")
-    
-    # Cleanup temp files
-    for temp_file in temp_files:
-        try:
-            temp_file.unlink()
-        except:
-            pass
+        async with semaphore:
+            print(f"Generating audio for {speaker}: {text[:50]}...")
+            return await synthesize_segment(text, voice, cache)
+
+    tasks = [asyncio.create_task(synthesize(speaker, text)) for speaker, text in segments]
+
+    audio_path = Path(f"{output_path}.audio.tmp")
+    tmp_path = Path(f"{output_path}.tmp")
+    chapters = []
+    position = 0.0
     try:
-        temp_dir.rmdir()
-    except:
-        pass
+        with open(audio_path, 'wb') as out:
+            # Write each segment as soon as it and everything before it is ready
+            for i, task in enumerate(tasks):
+                start = position
+                header, seconds = mp3.write_frames(out, await task)
+                position += seconds
+                if header is None:
+                    print(f"Segment {i} produced no audio frames, skipping")
+                    continue
+                speaker, text = segments[i]
+                chapters.append({
+                    "start": round(start, 3),
+                    "end": round(position, 3),
+                    "speaker": speaker.title(),
+                    "title": text if len(text) <= 80 else text[:77] + "...",
+                })
+                # Pause between speakers (but not after the last one)
+                if i < len(tasks) - 1:
+                    position += mp3.write_silence(out, header, PAUSE_SECONDS)
+
+        with instrumentation.span('podcast.assemble'):
+            # Exact duration straight from the frame headers we just wrote
+            duration = mp3.scan_duration(audio_path)
+
+            with open(tmp_path, 'wb') as out, open(audio_path, 'rb') as audio:
+                out.write(mp3.chapter_tag(chapters, title))
+                shutil.copyfileobj(audio, out)
+            tmp_path.replace(output_path)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        audio_path.unlink(missing_ok=True)
+
+    cache.prune()
+    stats = cache.stats()
+    instrumentation.set_section('tts_cache', stats)
+    print(f"TTS cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+    print(f"Combined audio saved to {output_path} ({duration:.1f}s, {len(chapters)} chapters)")
+    return duration, chapters
 
 def create_podcast(articles):
     """
@@ -201,36 +230,31 @@ def create_podcast(articles):
     podcast_dir = Path(__file__).parent.parent / 'data' / 'podcast'
     podcast_dir.mkdir(parents=True, exist_ok=True)
     
-    # Generate audio
-    output_path = podcast_dir / 'latest.mp3'
-    print(f"Generating audio to {output_path}...")
+    # Generate audio into a render file; the archive stores and links it by content
+    render_path = podcast_dir / 'render.mp3'
+    print(f"Generating audio to {render_path}...")
     
     # Run async audio generation
-    asyncio.run(combine_audio_segments(segments, str(output_path)))
-    
-    # Also save to archive with date
-    archive_dir = podcast_dir / 'archive'
-    archive_dir.mkdir(exist_ok=True)
     today = datetime.now().strftime('%Y-%m-%d')
-    archive_path = archive_dir / f'{today}.mp3'
-    
-    import shutil
-    shutil.copy(output_path, archive_path)
+    duration, chapters = asyncio.run(
+        combine_audio_segments(segments, str(render_path), title=f"AI Daily News - {today}")
+    )
     
-    # Get audio duration (approximate based on text length)
-    total_chars = sum(len(text) for _, text in segments)
-    estimated_duration = int(total_chars / 15)  # Rough estimate: 15 chars per second
+    description = "Today's stories: " + "; ".join(article['title'] for article in articles[:5])
+    episode_path = podcast_archive.publish_episode(render_path, today, duration, description)
     
     # Return podcast metadata
     podcast_metadata = {
-        "file": f"data/podcast/latest.mp3",
-        "duration": estimated_duration,
+        "file": f"data/podcast/episodes/{episode_path.name}",
+        "feed": "data/podcast/feed.xml",
+        "duration": round(duration, 3),
         "date": today,
         "speakers": ["Alex", "Jordan"],
-        "segments": len(segments)
+        "segments": len(segments),
+        "chapters": chapters
     }
     
-    print(f"Podcast generated successfully! Duration: ~{estimated_duration}s")
+    print(f"Podcast generated successfully! Duration: {duration:.1f}s")
     return podcast_metadata
 
 if __name__ == "__main__":
@@ -238,12 +262,11 @@ if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
     
-    # Load news data
-    news_file = Path(__file__).parent.parent / 'data' / 'news.json'
-    if news_file.exists():
-        with open(news_file, 'r') as f:
-            data = json.load(f)
-            articles = data.get('articles', [])
+    # Load the latest edition (news.json points at its shard)
+    import publish
+    data = publish.load_latest()
+    if data:
+        articles = data.get('articles', [])
             
         if articles:
             podcast_metadata = create_podcast(articles)
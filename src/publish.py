@@ -0,0 +1,144 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from dedupe import article_link, canonical_url
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; .br siblings are skipped if it is missing
+    brotli = None
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+INDEX_PATH = DATA_DIR / 'news.json'
+SHARDS_DIR = DATA_DIR / 'news'
+
+# Days of daily editions kept in the index
+RETENTION_DAYS = 30
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+def _relative(path):
+    return Path(path).relative_to(DATA_DIR.parent).as_posix()
+
+def encode(data):
+    """Compact, deterministic JSON bytes"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def write_atomic(path, payload):
+    """Write bytes to path via a temp file and rename, so readers never see a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+def write_compressed(path, payload):
+    """Write payload plus precompressed .gz (and .br if brotli is installed) siblings"""
+    write_atomic(path, payload)
+    # mtime=0 keeps the gzip bytes identical for identical input
+    write_atomic(f"{path}.gz", gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_atomic(f"{path}.br", brotli.compress(payload, quality=11))
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_latest(index_path=INDEX_PATH):
+    """
+    Return the latest edition as {'updated', 'articles', 'podcast'}, or {} if there is none.
+
+    Reads the index and follows it to the latest shard; an old single-file
+    news.json (articles inline) is returned as is.
+    """
+    index = _read_json(index_path)
+    if not index:
+        return {}
+    if 'articles' in index:
+        return index
+    shard = _read_json(DATA_DIR.parent / index['latest']) if index.get('latest') else None
+    if not shard:
+        return {}
+    data = {'updated': index.get('updated'), 'articles': shard.get('articles', [])}
+    if index.get('podcast'):
+        data['podcast'] = index['podcast']
+    return data
+
+def _collect_shards(keep):
+    """Delete shard files (and compressed siblings) the index no longer points at"""
+    removed = 0
+    for path in SHARDS_DIR.glob('*.json*'):
+        name = path.name
+        for suffix in COMPRESSED_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        if name not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+def _merge_day(articles, shard):
+    """This run's articles followed by those of the day's earlier shard it doesn't repeat"""
+    seen = {canonical_url(article_link(a)) for a in articles}
+    merged = list(articles)
+    for article in (shard or {}).get('articles', []):
+        key = canonical_url(article_link(article))
+        if key not in seen:
+            seen.add(key)
+            merged.append(article)
+    return merged
+
+def publish(articles, podcast=None, updated=None):
+    """
+    Write this run's edition and point the index at it.
+
+    The articles go to a content-addressed shard for the day,
+    data/news/<date>.<hash>.json, which never changes once written and can be
+    cached indefinitely. A later run on the same day merges its articles into
+    that day's earlier shard, this run's first, and replaces its entry.
+    data/news.json is a small index with the update time, the podcast and the
+    list of daily shards, newest first. The shard is written before the index,
+    so the index never points at a missing file.
+    """
+    updated = updated or datetime.datetime.now().isoformat()
+    date = updated[:10]
+
+    previous = _read_json(INDEX_PATH) or {}
+    earlier = next((s for s in previous.get('shards', []) if s['date'] == date), None)
+    if earlier:
+        articles = _merge_day(articles, _read_json(DATA_DIR.parent / earlier['path']))
+
+    payload = encode({'date': date, 'updated': updated, 'articles': articles})
+    shard_path = SHARDS_DIR / f"{date}.{hashlib.sha256(payload).hexdigest()[:12]}.json"
+    if not shard_path.exists():
+        write_compressed(shard_path, payload)
+
+    cutoff = (datetime.date.fromisoformat(date) - datetime.timedelta(days=RETENTION_DAYS)).isoformat()
+    shards = [{'date': date, 'path': _relative(shard_path), 'count': len(articles)}]
+    shards += [
+        s for s in previous.get('shards', [])
+        if s['date'] != date and s['date'] >= cutoff and (DATA_DIR.parent / s['path']).exists()
+    ]
+
+    index = {
+        'updated': updated,
+        'latest': shards[0]['path'],
+        'count': len(articles),
+        'shards': shards,
+    }
+    if podcast:
+        index['podcast'] = podcast
+    write_compressed(INDEX_PATH, encode(index))
+
+    removed = _collect_shards({Path(s['path']).name for s in shards})
+    if removed:
+        print(f"Removed {removed} superseded or expired news shard files")
+    return index
@@ -0,0 +1,91 @@
+import heapq
+import math
+import time
+
+from models import parse_date
+
+# Recency score halves every this many hours
+RECENCY_HALF_LIFE_HOURS = 24
+
+# Engagement (points + 2 x comments) that counts as a full score, on a log scale
+ENGAGEMENT_SATURATION = 1000
+
+SOURCE_WEIGHTS = {
+    'RSS': 1.0,
+    'Hacker News': 0.8,
+    'arXiv': 0.7,
+    'Reddit': 0.6,
+}
+
+# Most items any one source may contribute to the selection
+SOURCE_QUOTAS = {
+    'RSS': 10,
+    'Hacker News': 10,
+    'Reddit': 8,
+    'arXiv': 6,
+}
+
+# Scorers take (item, now) and return a score in [0, 1], or None when they
+# don't apply to the item (its weight is then spread over the others).
+
+def recency(item, now):
+    ts = item.get('published_ts') or parse_date(item.get('published'))
+    if ts is None:
+        return None
+    age_hours = max(0.0, now - ts) / 3600
+    return 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+def source_weight(item, now):
+    names = [s['source'] for s in item.get('sources', [])] or [item.get('source')]
+    return max(SOURCE_WEIGHTS.get(name, 0.5) for name in names)
+
+def engagement(item, now):
+    if 'score' not in item and 'comments' not in item:
+        return None
+    total = item.get('score', 0) + 2 * item.get('comments', 0)
+    return min(1.0, math.log1p(max(0, total)) / math.log1p(ENGAGEMENT_SATURATION))
+
+def relevance_score(item, now):
+    return item.get('relevance')
+
+DEFAULT_SCORERS = [
+    (recency, 0.35),
+    (source_weight, 0.25),
+    (engagement, 0.2),
+    (relevance_score, 0.2),
+]
+
+def score_item(item, scorers=DEFAULT_SCORERS, now=None):
+    """Weighted mean of the scorers that apply to item"""
+    now = time.time() if now is None else now
+    total = 0.0
+    weight_sum = 0.0
+    for scorer, weight in scorers:
+        value = scorer(item, now)
+        if value is not None:
+            total += weight * value
+            weight_sum += weight
+    return total / weight_sum if weight_sum else 0.0
+
+def select_top(items, n=30, scorers=DEFAULT_SCORERS, quotas=SOURCE_QUOTAS, now=None):
+    """
+    Return the n best items, best first, with no source over its quota.
+
+    Scores are computed once and heapified in O(len(items)); only as many
+    pops as needed to fill n slots are made. Ties keep fetch order.
+    """
+    now = time.time() if now is None else now
+    heap = [(-score_item(item, scorers, now), i) for i, item in enumerate(items)]
+    heapq.heapify(heap)
+
+    taken = {}
+    selected = []
+    while heap and len(selected) < n:
+        _, i = heapq.heappop(heap)
+        source = items[i].get('source')
+        quota = quotas.get(source)
+        if quota is not None and taken.get(source, 0) >= quota:
+            continue
+        taken[source] = taken.get(source, 0) + 1
+        selected.append(items[i])
+    return selected
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Like acquire, but yields to the event loop while waiting"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+# Multiplier on every rate, for runs against local stand-in services (see bench/)
+RATE_SCALE = float(os.environ.get('RATE_LIMIT_SCALE', 1))
+
+# Per-provider limits, sized to the free tiers we run on
+BUCKETS = {
+    'duckduckgo': TokenBucket(rate=0.5 * RATE_SCALE, capacity=2),   # image search throttles aggressively
+    'groq': TokenBucket(rate=0.5 * RATE_SCALE, capacity=5),         # 30 requests/minute
+    'openrouter': TokenBucket(rate=0.33 * RATE_SCALE, capacity=3),  # 20 requests/minute
+}
+
+def acquire(provider, tokens=1):
+    """Wait for a request slot on the named provider's bucket"""
+    BUCKETS[provider].acquire(tokens)
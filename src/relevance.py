@@ -0,0 +1,166 @@
+"""
+Shared AI-relevance check used by the scrapers and image search.
+
+Titles are matched against one compiled, whole-word keyword pattern. If a
+trained model file is present, a small logistic scorer over unigram and
+bigram features refines the score; train one offline with
+
+    python src/relevance.py train labeled.jsonl
+
+where each line is {"text": "...", "label": 0 or 1}.
+"""
+import json
+import math
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+MODEL_PATH = Path(__file__).parent / 'relevance_model.json'
+
+# Terms that mark a story as AI-related. Bare "model" is left out on purpose:
+# it matches car models and data models far more often than ML ones.
+KEYWORDS = [
+    r'ai', r'a\.i\.', r'agi', r'artificial intelligence',
+    r'machine learning', r'deep learning', r'reinforcement learning',
+    r'neural (?:net|nets|network|networks)', r'transformers?', r'embeddings?',
+    r'llms?', r'gpt(?:-?\d[\w.]*)?', r'chatgpt', r'openai', r'anthropic', r'claude',
+    r'gemini', r'deepmind', r'llama', r'mistral', r'hugging ?face', r'copilot',
+    r'(?:language|foundation|diffusion|vision|reasoning|frontier|open[- ]weights?) models?',
+    r'fine-?tun(?:e|ed|es|ing)', r'inference', r'rag', r'agentic',
+    r'computer vision', r'nlp', r'generative',
+]
+
+# Lookarounds rather than \b, which would need a word character after the final dot of "a.i."
+KEYWORD_RE = re.compile(r'(?<!\w)(?:' + '|'.join(KEYWORDS) + r')(?!\w)', re.IGNORECASE)
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Model probability at or above which an item counts as relevant
+DEFAULT_THRESHOLD = 0.5
+
+def keyword_hits(text):
+    """Distinct keywords found in text, lowercased"""
+    return {m.group(0).lower() for m in KEYWORD_RE.finditer(text or '')}
+
+def features(text):
+    """Unigram and bigram features of text"""
+    tokens = TOKEN_RE.findall((text or '').lower())
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+class Model:
+    """Logistic scorer; IDF weighting is folded into the stored weights at training time"""
+
+    def __init__(self, weights, bias, threshold=DEFAULT_THRESHOLD):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data['weights'], data['bias'], data.get('threshold', DEFAULT_THRESHOLD))
+
+    def save(self, path=MODEL_PATH):
+        tmp_path = Path(path).with_name(f"{Path(path).name}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'bias': self.bias, 'threshold': self.threshold, 'weights': self.weights}, f,
+                      separators=(',', ':'), sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def probability(self, text):
+        z = self.bias + sum(self.weights.get(f, 0.0) for f in features(text))
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+_model = None
+_model_loaded = False
+
+def get_model():
+    """Return the trained model, or None if no model file is shipped"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        try:
+            _model = Model.load()
+        except (OSError, ValueError, KeyError):
+            _model = None
+    return _model
+
+def score(text):
+    """
+    Relevance of text in [0, 1].
+
+    Uses the trained model when available; otherwise each distinct keyword
+    halves the remaining distance to 1 (one hit 0.5, two 0.75, ...).
+    """
+    model = get_model()
+    if model is not None:
+        return model.probability(text)
+    return 1 - 0.5 ** len(keyword_hits(text))
+
+def is_relevant(text):
+    """
+    Whether text looks AI-related: a keyword hit, or the model's vote if one is trained.
+
+    >>> [bool(KEYWORD_RE.search(t)) for t in ('The A.I. revolution', 'she said', 'maintain')]
+    [True, False, False]
+    """
+    if KEYWORD_RE.search(text or ''):
+        return True
+    model = get_model()
+    return model is not None and model.probability(text) >= model.threshold
+
+def item_text(item):
+    return f"{item.get('title', '')} {item.get('description', '')}"
+
+def annotate(items):
+    """Attach a 'relevance' score to every item"""
+    for item in items:
+        item['relevance'] = round(score(item_text(item)), 4)
+    return items
+
+def train(examples, epochs=20, learning_rate=0.5, l2=1e-4, min_weight=1e-3):
+    """
+    Fit a logistic model on (text, label) pairs with plain SGD.
+
+    Features are binary unigrams/bigrams scaled by IDF; the scaling is
+    folded into the saved weights so scoring is a dictionary sum.
+    """
+    docs = [(features(text), label) for text, label in examples]
+    df = {}
+    for feats, _ in docs:
+        for f in feats:
+            df[f] = df.get(f, 0) + 1
+    n = len(docs)
+    idf = {f: math.log((1 + n) / (1 + count)) + 1 for f, count in df.items()}
+
+    weights = {}
+    bias = 0.0
+    rng = random.Random(0)
+    for _ in range(epochs):
+        rng.shuffle(docs)
+        for feats, label in docs:
+            z = bias + sum(weights.get(f, 0.0) * idf[f] for f in feats)
+            error = 1 / (1 + math.exp(-max(-30.0, min(30.0, z)))) - label
+            bias -= learning_rate * error
+            for f in feats:
+                w = weights.get(f, 0.0)
+                weights[f] = w - learning_rate * (error * idf[f] + l2 * w)
+
+    folded = {f: round(w * idf[f], 4) for f, w in weights.items() if abs(w * idf[f]) >= min_weight}
+    return Model(folded, round(bias, 4))
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'train':
+        print("Usage: python src/relevance.py train labeled.jsonl")
+        sys.exit(1)
+    with open(sys.argv[2], 'r') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    examples = [(row['text'], int(row['label'])) for row in rows]
+    model = train(examples)
+    model.save()
+    correct = sum((model.probability(text) >= model.threshold) == bool(label) for text, label in examples)
+    print(f"Trained on {len(examples)} examples ({correct / len(examples):.1%} training accuracy), "
+          f"{len(model.weights)} weights -> {MODEL_PATH}")
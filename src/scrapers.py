@@ -1,55 +1,45 @@
+import os
+import time
 import requests
-import feedparser
-import datetime
+import hn_cache
+import http_client
+import instrumentation
+import meta_extractor
+import relevance
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from concurrency import bounded_map
+from models import Article
+
+# API endpoints; overridable so the pipeline can run against local stand-ins (see bench/)
+HN_API_URL = os.environ.get('HN_API_URL', 'https://hacker-news.firebaseio.com/v0')
+REDDIT_API_URL = os.environ.get('REDDIT_API_URL', 'https://www.reddit.com')
+ARXIV_API_URL = os.environ.get('ARXIV_API_URL', 'http://export.arxiv.org/api/query')
+
+# How many top stories to scan for AI-related ones
+HN_SCAN_DEPTH = int(os.environ.get('HN_SCAN_DEPTH', 500))
+
+# Cached stories matching the filter get a fresh score after this many seconds
+HN_SCORE_REFRESH = 3600
 
 def extract_image(url, retries=2):
-    """Extract Open Graph image from URL with retry logic, fallback to placeholder"""
+    """
+    Extract the Open Graph / Twitter card image from a URL, or "" if there is none.
+
+    Only the page's <head> is streamed and scanned. Results, including misses,
+    are remembered in a persistent cache so repeat runs skip the request.
+    """
+    cache = meta_extractor.get_cache()
+    cached = cache.get(url)
+    if cached is not None:
+        return cached
+
     for attempt in range(retries):
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=3, allow_redirects=True)
-            
-            if response.status_code != 200:
-                continue
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try Open Graph image
-            og_image = soup.find('meta', property='og:image')
-            if og_image and og_image.get('content'):
-                img_url = og_image['content']
-                # Ensure absolute URL
-                if img_url.startswith('//'):
-                    img_url = 'https:' + img_url
-                elif img_url.startswith('/'):
-                    from urllib.parse import urljoin
-                    img_url = urljoin(url, img_url)
-                return img_url
-            
-            # Try Open Graph image:secure_url
-            og_image_secure = soup.find('meta', property='og:image:secure_url')
-            if og_image_secure and og_image_secure.get('content'):
-                return og_image_secure['content']
-            
-            # Try Twitter image
-            twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-            if twitter_image and twitter_image.get('content'):
-                return twitter_image['content']
-            
-            # Try Twitter image:src
-            twitter_image_src = soup.find('meta', attrs={'name': 'twitter:image:src'})
-            if twitter_image_src and twitter_image_src.get('content'):
-                return twitter_image_src['content']
-            
-            # Try article:image
-            article_image = soup.find('meta', property='article:image')
-            if article_image and article_image.get('content'):
-                return article_image['content']
-                
+            with instrumentation.span('image.og_extract'):
+                meta, final_url = meta_extractor.fetch_head_meta(url)
+            image = meta_extractor.best_image(meta, final_url) if meta else ""
+            cache.put(url, image)
+            return image
         except requests.Timeout:
             if attempt < retries - 1:
                 continue
@@ -57,126 +47,202 @@ def extract_image(url, retries=2):
         except Exception as e:
             if attempt < retries - 1:
                 continue
+            instrumentation.incr('errors.og_extract')
             print(f"Image extraction failed for {url}: {e}")
     
-    # Fallback placeholder from Unsplash (AI theme) - return empty to let image_generator handle it
+    # Return empty to let image_generator handle it
     return ""
 
+def _fetch_feed(url):
+    """Fetch and parse a single RSS feed into news items"""
+    import feedparser
+    from bs4 import BeautifulSoup
+
+    news_items = []
+    try:
+        feed = feedparser.parse(http_client.get(url).content)
+        for entry in feed.entries[:5]: # Top 5 from each
+            # Include description/summary for better AI summarization context
+            description = entry.get('summary', entry.get('description', ''))
+            # Strip HTML tags from description if present
+            if description:
+                try:
+                    soup = BeautifulSoup(description, 'html.parser')
+                    description = soup.get_text(separator=' ', strip=True)[:500]
+                except Exception:
+                    description = description[:500]
+            news_items.append(Article.create(
+                'RSS',
+                feed.feed.get('title', urlparse(url).netloc),
+                entry.title,
+                entry.link,
+                entry.get('published_parsed') or entry.get('published'),
+                description=description,
+                image="",  # Let image_generator handle all images for consistency
+            ))
+    except Exception as e:
+        instrumentation.incr('errors.fetch.rss')
+        print(f"Error fetching RSS {url}: {e}")
+    return news_items
+
 def get_rss_news(feed_urls):
     news_items = []
-    for url in feed_urls:
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]: # Top 5 from each
-                # Include description/summary for better AI summarization context
-                description = entry.get('summary', entry.get('description', ''))
-                # Strip HTML tags from description if present
-                if description:
-                    try:
-                        soup = BeautifulSoup(description, 'html.parser')
-                        description = soup.get_text(separator=' ', strip=True)[:500]
-                    except Exception:
-                        description = description[:500]
-                news_items.append({
-                    'source': 'RSS',
-                    'source_name': feed.feed.get('title', urlparse(url).netloc),
-                    'title': entry.title,
-                    'url': entry.link,
-                    'published': entry.get('published', datetime.datetime.now().isoformat()),
-                    'description': description,
-                    'image': ""  # Let image_generator handle all images for consistency
-                })
-        except Exception as e:
-            print(f"Error fetching RSS {url}: {e}")
+    # Feeds are fetched concurrently but merged in the order given
+    for items in bounded_map(_fetch_feed, feed_urls):
+        news_items.extend(items or [])
     return news_items
 
-def get_hacker_news(limit=10):
+def _fetch_hn_item(sid):
+    url = f'{HN_API_URL}/item/{sid}.json'
+    # The persistent item cache replaces HTTP caching for these
+    return http_client.get(url, cache=False).json()
+
+def _is_story(item):
+    return bool(item) and item.get('type', 'story') == 'story' and 'title' in item and 'url' in item \
+        and not item.get('dead') and not item.get('deleted')
+
+def get_hacker_news(limit=10, scan_depth=HN_SCAN_DEPTH):
+    """
+    Return up to `limit` AI-related stories from the first `scan_depth` top stories.
+
+    Items come from a persistent cache keyed by story id; only ids not seen
+    before are fetched, concurrently. Cached matches have their score and
+    comment count refreshed when older than HN_SCORE_REFRESH. Images are left
+    empty for the image stage to fill in from the linked page.
+    """
     news_items = []
+    cache = hn_cache.HNItemCache()
     try:
         # Get top stories IDs
-        resp = requests.get('https://hacker-news.firebaseio.com/v0/topstories.json')
-        story_ids = resp.json()[:30] # Check top 30 to filter for AI
-        
+        url = f'{HN_API_URL}/topstories.json'
+        resp = http_client.get(url)
+        story_ids = resp.json()[:scan_depth]
+
+        items = {}
+        missing = []
         for sid in story_ids:
-            item_resp = requests.get(f'https://hacker-news.firebaseio.com/v0/item/{sid}.json')
-            item = item_resp.json()
-            
-            if not item or 'title' not in item or 'url' not in item:
+            cached = cache.get(sid)
+            if cached is None:
+                missing.append(sid)
+            else:
+                items[sid] = cached
+        with instrumentation.span('fetch.hn_items'):
+            fetched = bounded_map(_fetch_hn_item, missing)
+        instrumentation.incr('hn.items_fetched', len(missing))
+        instrumentation.incr('hn.items_cached', len(items))
+        for sid, item in zip(missing, fetched):
+            if item is not None:
+                items[sid] = cache.put(sid, item)
+
+        matches = []
+        for sid in story_ids:
+            if sid not in items:
+                continue
+            item, fetched_at = items[sid]
+            if not _is_story(item):
                 continue
 
-            title_lower = item['title'].lower()
-            if any(kw in title_lower for kw in ['ai', 'llm', 'gpt', 'machine learning', 'neural', 'model']):
-                news_items.append({
-                    'source': 'Hacker News',
-                    'source_name': 'Hacker News',
-                    'title': item['title'],
-                    'url': item['url'],
-                    'published': datetime.datetime.fromtimestamp(item.get('time', datetime.datetime.now().timestamp())).isoformat(),
-                    'description': '',
-                    'image': extract_image(item['url'])
-                })
-                if len(news_items) >= limit:
+            if relevance.is_relevant(item['title']):
+                matches.append((item, fetched_at))
+                if len(matches) >= limit:
                     break
+
+        now = time.time()
+        stale = [item['id'] for item, fetched_at in matches if now - fetched_at > HN_SCORE_REFRESH]
+        refreshed = {}
+        for sid, fresh in zip(stale, bounded_map(_fetch_hn_item, stale)):
+            if fresh is not None:
+                refreshed[sid] = cache.put(sid, fresh)[0]
+
+        for item, _ in matches:
+            item = refreshed.get(item['id'], item)
+            news_items.append(Article.create(
+                'Hacker News',
+                'Hacker News',
+                item['title'],
+                item['url'],
+                item.get('time'),
+                image="",  # Filled from the linked page's og:image in the image stage
+                score=item.get('score', 0),
+                comments=item.get('descendants', 0),
+            ))
+        print(f"Hacker News: scanned {len(story_ids)} stories, fetched {len(missing) + len(stale)}")
     except Exception as e:
+        instrumentation.incr('errors.fetch.hn')
         print(f"Error fetching Hacker News: {e}")
+    finally:
+        cache.save()
+    return news_items
+
+def _fetch_subreddit(sub, limit):
+    news_items = []
+    try:
+        url = f'{REDDIT_API_URL}/r/{sub}/top.json?t=day&limit={limit}'
+        resp = http_client.get(url)
+        if resp.status_code != 200:
+            print(f"Reddit error {resp.status_code} for {sub}")
+            return news_items
+            
+        data = resp.json()
+        for post in data['data']['children']:
+            post_data = post['data']
+            if post_data.get('stickied'): continue
+            
+            # Reddit often has preview images
+            image = "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=450&fit=crop"
+            if 'preview' in post_data and 'images' in post_data['preview']:
+                image = post_data['preview']['images'][0]['source']['url'].replace('&amp;', '&')
+            elif 'thumbnail' in post_data and post_data['thumbnail'].startswith('http'):
+                image = post_data['thumbnail']
+            
+            # Include selftext for posts with body content
+            description = post_data.get('selftext', '')[:500] if post_data.get('selftext') else ''
+            news_item = Article.create(
+                'Reddit',
+                f'r/{sub}',
+                post_data['title'],
+                f"https://www.reddit.com{post_data['permalink']}",
+                post_data['created_utc'],
+                description=description,
+                image=image,
+                score=post_data.get('score', 0),
+                comments=post_data.get('num_comments', 0),
+            )
+            # Link posts point elsewhere; keep the target so dedupe can match it across sources
+            if not post_data.get('is_self') and post_data.get('url', '').startswith('http'):
+                news_item['link_url'] = post_data['url']
+            news_items.append(news_item)
+    except Exception as e:
+        instrumentation.incr('errors.fetch.reddit')
+        print(f"Error fetching Reddit {sub}: {e}")
     return news_items
 
 def get_reddit_news(subreddits=['LocalLLaMA', 'ArtificialIntelligence', 'MachineLearning'], limit=5):
     news_items = []
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-    
-    for sub in subreddits:
-        try:
-            url = f'https://www.reddit.com/r/{sub}/top.json?t=day&limit={limit}'
-            resp = requests.get(url, headers=headers)
-            if resp.status_code != 200:
-                print(f"Reddit error {resp.status_code} for {sub}")
-                continue
-                
-            data = resp.json()
-            for post in data['data']['children']:
-                post_data = post['data']
-                if post_data.get('stickied'): continue
-                
-                # Reddit often has preview images
-                image = "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=450&fit=crop"
-                if 'preview' in post_data and 'images' in post_data['preview']:
-                    image = post_data['preview']['images'][0]['source']['url'].replace('&amp;', '&')
-                elif 'thumbnail' in post_data and post_data['thumbnail'].startswith('http'):
-                    image = post_data['thumbnail']
-                
-                # Include selftext for posts with body content
-                description = post_data.get('selftext', '')[:500] if post_data.get('selftext') else ''
-                news_items.append({
-                    'source': 'Reddit',
-                    'source_name': f'r/{sub}',
-                    'title': post_data['title'],
-                    'url': f"https://www.reddit.com{post_data['permalink']}",
-                    'published': datetime.datetime.fromtimestamp(post_data['created_utc']).isoformat(),
-                    'description': description,
-                    'image': image
-                })
-        except Exception as e:
-            print(f"Error fetching Reddit {sub}: {e}")
+    for items in bounded_map(lambda sub: _fetch_subreddit(sub, limit), subreddits):
+        news_items.extend(items or [])
     return news_items
 
 def get_arxiv_papers(query='cat:cs.AI OR cat:cs.LG', limit=5):
+    import feedparser
+
     news_items = []
     try:
-        url = f'http://export.arxiv.org/api/query?search_query={query}&start=0&max_results={limit}&sortBy=submittedDate&sortOrder=descending'
-        feed = feedparser.parse(url)
+        url = f'{ARXIV_API_URL}?search_query={query}&start=0&max_results={limit}&sortBy=submittedDate&sortOrder=descending'
+        feed = feedparser.parse(http_client.get(url).content)
         for entry in feed.entries:
             # arXiv entries include the abstract in entry.summary
             description = entry.get('summary', '').replace('\n', ' ')[:500]
-            news_items.append({
-                'source': 'arXiv',
-                'source_name': 'arXiv',
-                'title': entry.title.replace('\n', ' '),
-                'url': entry.link,
-                'published': entry.published,
-                'description': description,
-                'image': "https://images.unsplash.com/photo-1635070041078-e363dbe005cb?w=800&h=450&fit=crop"  # Academic theme
-            })
+            news_items.append(Article.create(
+                'arXiv',
+                'arXiv',
+                entry.title.replace('\n', ' '),
+                entry.link,
+                entry.get('published_parsed') or entry.get('published'),
+                description=description,
+                image="https://images.unsplash.com/photo-1635070041078-e363dbe005cb?w=800&h=450&fit=crop",  # Academic theme
+            ))
     except Exception as e:
+        instrumentation.incr('errors.fetch.arxiv')
         print(f"Error fetching arXiv: {e}")
     return news_items
@@ -0,0 +1,107 @@
+// Client side of the static search index built by src/search_index.py.
+// Tokenizing and stemming must match the Python side exactly.
+
+const SUFFIXES = ['ational', 'ization', 'fulness', 'iveness', 'ations', 'ation', 'ements', 'ement',
+    'ments', 'ment', 'ness', 'ings', 'ing', 'ies', 'ied', 'edly', 'ers', 'er', 'ed', 'ly', 'es', 's']
+
+export function stem(token) {
+    if (token.length <= 3 || /^\d+$/.test(token)) return token
+    for (const suffix of SUFFIXES) {
+        if (!token.endsWith(suffix) || token.length - suffix.length < 3) continue
+        const base = token.slice(0, -suffix.length)
+        if (suffix === 'ies' || suffix === 'ied') return base + 'y'
+        if (suffix === 'es' && !/(s|x|z|ch|sh)$/.test(base)) return token.slice(0, -1)
+        if (suffix === 's' && /[sui]$/.test(base)) return token
+        return base
+    }
+    return token
+}
+
+export function tokenize(text, stopwords) {
+    return (text.toLowerCase().match(/[a-z0-9]+/g) || [])
+        .filter(token => token.length > 1 && !stopwords.has(token))
+        .map(stem)
+}
+
+let manifestPromise = null
+const files = new Map()
+
+function loadManifest() {
+    if (!manifestPromise) {
+        manifestPromise = fetch(`data/search/manifest.json?t=${Date.now()}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`search manifest: ${response.status}`)
+                return response.json()
+            })
+            .then(manifest => ({ ...manifest, stopwords: new Set(manifest.stopwords) }))
+            .catch(error => {
+                manifestPromise = null
+                throw error
+            })
+    }
+    return manifestPromise
+}
+
+// Shard and doc files are content-addressed, so each is fetched at most once
+function loadFile(path) {
+    if (!files.has(path)) {
+        files.set(path, fetch(path).then(response => response.json()))
+    }
+    return files.get(path)
+}
+
+function addPostings(scores, postings) {
+    let doc = 0
+    for (let i = 0; i < postings.length; i += 2) {
+        doc += postings[i]
+        scores.set(doc, (scores.get(doc) || 0) + postings[i + 1])
+    }
+}
+
+/**
+ * Search the published archive. Every query term must match; the last one
+ * also matches as a prefix so results update while typing. Resolves to
+ * [{title, url, source, date}], best first.
+ */
+export async function search(query, limit = 20) {
+    const manifest = await loadManifest()
+    const terms = tokenize(query, manifest.stopwords)
+    if (terms.length === 0) return []
+
+    const prefix = term => term.slice(0, manifest.prefix_length)
+    const shards = {}
+    await Promise.all([...new Set(terms.map(prefix))].map(async p => {
+        const path = manifest.term_files[p]
+        shards[p] = path ? await loadFile(path) : {}
+    }))
+
+    let scores = null
+    terms.forEach((term, i) => {
+        const shard = shards[prefix(term)]
+        const matching = i === terms.length - 1
+            ? Object.keys(shard).filter(t => t.startsWith(term))
+            : (shard[term] ? [term] : [])
+        const termScores = new Map()
+        matching.forEach(t => addPostings(termScores, shard[t]))
+        if (scores === null) {
+            scores = termScores
+        } else {
+            const both = new Map()
+            termScores.forEach((weight, doc) => {
+                if (scores.has(doc)) both.set(doc, scores.get(doc) + weight)
+            })
+            scores = both
+        }
+    })
+
+    const top = [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit)
+    const chunks = await Promise.all(
+        [...new Set(top.map(([doc]) => Math.floor(doc / manifest.doc_chunk_size)))]
+            .map(async n => [n, await loadFile(manifest.doc_files[n])])
+    )
+    const docs = new Map(chunks)
+    return top.map(([doc]) => {
+        const [title, url, source, date] = docs.get(Math.floor(doc / manifest.doc_chunk_size))[doc % manifest.doc_chunk_size]
+        return { title, url, source, date }
+    })
+}
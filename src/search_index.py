@@ -0,0 +1,146 @@
+"""
+Static inverted index over published articles, for search in the browser.
+
+Layout under data/search/:
+
+    manifest.json                 doc count, stopwords, shard file names
+    docs/<n>.<hash>.json          [title, url, source, date] rows, DOC_CHUNK_SIZE per file
+    terms/<prefix>.<hash>.json    {term: postings} for terms starting with prefix
+
+Postings are flat [doc gap, weight, doc gap, weight, ...] lists: doc ids are
+sorted and delta-encoded, so most gaps are one or two digits. The browser
+fetches the manifest, then only the term shards and doc chunks a query
+touches (see src/search.js, which must tokenize the same way).
+"""
+import hashlib
+import json
+import re
+
+from dedupe import STOPWORDS
+from publish import DATA_DIR, INDEX_PATH, encode, load_latest, write_atomic
+
+SEARCH_DIR = DATA_DIR / 'search'
+MANIFEST_PATH = SEARCH_DIR / 'manifest.json'
+
+# Term shards are keyed by this many leading characters
+PREFIX_LENGTH = 2
+
+DOC_CHUNK_SIZE = 200
+
+# How much a term occurrence counts in each field
+FIELD_WEIGHTS = (('title', 3), ('source_name', 2), ('summary', 1))
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Light suffix stripping, longest first; mirrored in src/search.js
+SUFFIXES = ('ational', 'ization', 'fulness', 'iveness', 'ations', 'ation', 'ements', 'ement',
+            'ments', 'ment', 'ness', 'ings', 'ing', 'ies', 'ied', 'edly', 'ers', 'er', 'ed', 'ly', 'es', 's')
+
+def stem(token):
+    if len(token) <= 3 or token.isdigit():
+        return token
+    for suffix in SUFFIXES:
+        if not token.endswith(suffix) or len(token) - len(suffix) < 3:
+            continue
+        base = token[:-len(suffix)]
+        if suffix in ('ies', 'ied'):
+            return base + 'y'
+        if suffix == 'es' and not base.endswith(('s', 'x', 'z', 'ch', 'sh')):
+            return token[:-1]  # "images" -> "image", but "classes" -> "class"
+        if suffix == 's' and base.endswith(('s', 'u', 'i')):
+            return token  # "class", "status", "analysis"
+        return base
+    return token
+
+def tokenize(text):
+    """Lowercased, stopword-free, stemmed terms of text (single characters dropped)"""
+    return [
+        stem(token) for token in TOKEN_RE.findall((text or '').lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+def collect_documents(index_path=INDEX_PATH):
+    """Every article in the published editions, newest edition first, one per URL"""
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if 'shards' not in index:
+        return load_latest(index_path).get('articles', [])
+
+    seen = set()
+    documents = []
+    for shard in index['shards']:
+        try:
+            with open(DATA_DIR.parent / shard['path'], 'r') as f:
+                articles = json.load(f)['articles']
+        except (OSError, ValueError, KeyError):
+            continue
+        for article in articles:
+            if article['url'] not in seen:
+                seen.add(article['url'])
+                documents.append(article)
+    return documents
+
+def _write_hashed(directory, stem_name, data):
+    payload = encode(data)
+    path = directory / f"{stem_name}.{hashlib.sha256(payload).hexdigest()[:10]}.json"
+    if not path.exists():
+        write_atomic(path, payload)
+    return path
+
+def build(articles=None):
+    """Build the search index for articles (default: all published editions); returns the manifest"""
+    articles = collect_documents() if articles is None else articles
+
+    postings = {}
+    for doc_id, article in enumerate(articles):
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS:
+            for term in tokenize(article.get(field)):
+                weights[term] = weights.get(term, 0) + field_weight
+        for term, weight in weights.items():
+            postings.setdefault(term, []).append((doc_id, weight))
+
+    shards = {}
+    for term in sorted(postings):
+        encoded = []
+        previous = 0
+        for doc_id, weight in postings[term]:  # already in doc id order
+            encoded += [doc_id - previous, weight]
+            previous = doc_id
+        shards.setdefault(term[:PREFIX_LENGTH], {})[term] = encoded
+
+    docs_dir = SEARCH_DIR / 'docs'
+    terms_dir = SEARCH_DIR / 'terms'
+    doc_files = [
+        _write_hashed(docs_dir, str(n), [
+            [a['title'], a['url'], a.get('source_name') or a.get('source', ''), (a.get('published') or '')[:10]]
+            for a in articles[start:start + DOC_CHUNK_SIZE]
+        ])
+        for n, start in enumerate(range(0, len(articles), DOC_CHUNK_SIZE))
+    ]
+    term_files = {prefix: _write_hashed(terms_dir, prefix, shard) for prefix, shard in shards.items()}
+
+    def rel(path):
+        return path.relative_to(DATA_DIR.parent).as_posix()
+
+    manifest = {
+        'docs': len(articles),
+        'doc_chunk_size': DOC_CHUNK_SIZE,
+        'prefix_length': PREFIX_LENGTH,
+        'stopwords': sorted(STOPWORDS),
+        'doc_files': [rel(p) for p in doc_files],
+        'term_files': {prefix: rel(p) for prefix, p in term_files.items()},
+    }
+    write_atomic(MANIFEST_PATH, encode(manifest))
+
+    # Drop shard files from earlier builds
+    keep = set(doc_files) | set(term_files.values())
+    for path in [*docs_dir.glob('*.json'), *terms_dir.glob('*.json')]:
+        if path not in keep:
+            path.unlink(missing_ok=True)
+
+    print(f"Search index: {len(articles)} articles, {len(postings)} terms in {len(term_files)} shards")
+    return manifest
@@ -0,0 +1,293 @@
+import datetime
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+from dedupe import article_link, canonical_url
+from models import Article
+from publish import encode, write_atomic
+
+STORE_PATH = Path(__file__).parent.parent / '.cache' / 'news.sqlite3'
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY,
+        canonical_url TEXT NOT NULL UNIQUE,
+        url TEXT NOT NULL,
+        link_url TEXT,
+        title TEXT NOT NULL,
+        source TEXT NOT NULL,
+        source_name TEXT,
+        published_ts INTEGER NOT NULL,
+        description TEXT NOT NULL DEFAULT '',
+        score INTEGER,
+        comments INTEGER,
+        relevance REAL,
+        first_seen REAL NOT NULL,
+        last_seen REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS articles_published ON articles (published_ts);
+    CREATE INDEX IF NOT EXISTS articles_source ON articles (source, published_ts);
+
+    CREATE TABLE IF NOT EXISTS sources (
+        article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+        source TEXT NOT NULL,
+        source_name TEXT,
+        url TEXT NOT NULL,
+        PRIMARY KEY (article_id, url)
+    );
+
+    CREATE TABLE IF NOT EXISTS summaries (
+        article_id INTEGER PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE,
+        summary TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS images (
+        article_id INTEGER PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE,
+        image TEXT NOT NULL,
+        image_meta TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS episodes (
+        date TEXT PRIMARY KEY,
+        file TEXT NOT NULL,
+        duration REAL,
+        metadata TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+"""
+
+# Title, description and summary, searchable; rowid is the article id
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5 (title, description, summary)"
+
+_SELECT = """
+    SELECT a.id, a.canonical_url, a.url, a.link_url, a.title, a.source, a.source_name, a.published_ts,
+           a.description, a.score, a.comments, a.relevance, s.summary, i.image, i.image_meta
+    FROM articles a
+    LEFT JOIN summaries s ON s.article_id = a.id
+    LEFT JOIN images i ON i.article_id = a.id
+"""
+
+class ArticleStore:
+    """History of every article seen, with its enrichment and the podcast episodes, in SQLite"""
+
+    def __init__(self, path=STORE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        # WAL lets readers (exports, ad-hoc queries) run while a run is writing
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.execute(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5
+            self.fts = False
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def upsert_articles(self, articles, unavailable=None):
+        """
+        Insert or refresh many articles in one transaction.
+
+        Identity is the canonical URL. Engagement and relevance are updated
+        on every sighting. A summary is stored when present (and not the
+        'unavailable' placeholder), and likewise an image. Returns the ids in
+        input order.
+        """
+        now = time.time()
+        rows = []
+        for item in articles:
+            rows.append((
+                canonical_url(article_link(item)), item['url'], item.get('link_url'), item['title'],
+                item['source'], item.get('source_name'), item.get('published_ts') or int(now),
+                item.get('description', ''), item.get('score'), item.get('comments'), item.get('relevance'),
+                now, now,
+            ))
+
+        with self.lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO articles (canonical_url, url, link_url, title, source, source_name, published_ts,
+                                      description, score, comments, relevance, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (canonical_url) DO UPDATE SET
+                    title = excluded.title,
+                    description = CASE WHEN length(excluded.description) > length(articles.description)
+                                       THEN excluded.description ELSE articles.description END,
+                    score = COALESCE(excluded.score, articles.score),
+                    comments = COALESCE(excluded.comments, articles.comments),
+                    relevance = COALESCE(excluded.relevance, articles.relevance),
+                    last_seen = excluded.last_seen
+            """, rows)
+            ids = self._ids([row[0] for row in rows])
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sources (article_id, source, source_name, url) VALUES (?, ?, ?, ?)",
+                [
+                    (article_id, s['source'], s.get('source_name'), s['url'])
+                    for article_id, item in zip(ids, articles)
+                    for s in (item.get('sources') or [item])
+                ]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO summaries (article_id, summary, created_at) VALUES (?, ?, ?)",
+                [
+                    (article_id, item['summary'], now) for article_id, item in zip(ids, articles)
+                    if item.get('summary') and item['summary'] != unavailable
+                ]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO images (article_id, image, image_meta) VALUES (?, ?, ?)",
+                [
+                    (article_id, item['image'], json.dumps(item['image_meta']) if item.get('image_meta') else None)
+                    for article_id, item in zip(ids, articles) if item.get('image')
+                ]
+            )
+            if self.fts:
+                self.conn.executemany("DELETE FROM articles_fts WHERE rowid = ?", [(i,) for i in ids])
+                for chunk in _chunks(sorted(set(ids))):
+                    self.conn.execute(f"""
+                        INSERT INTO articles_fts (rowid, title, description, summary)
+                        SELECT a.id, a.title, a.description, COALESCE(s.summary, '')
+                        FROM articles a LEFT JOIN summaries s ON s.article_id = a.id
+                        WHERE a.id IN ({','.join('?' * len(chunk))})
+                    """, chunk)
+        return ids
+
+    def _ids(self, canonical_urls):
+        found = {}
+        for chunk in _chunks(sorted(set(canonical_urls))):
+            found.update(self.conn.execute(
+                f"SELECT canonical_url, id FROM articles WHERE canonical_url IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+        return [found[url] for url in canonical_urls]
+
+    def _rows_to_articles(self, rows):
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        sources = {}
+        for chunk in _chunks(ids):
+            for article_id, source, source_name, url in self.conn.execute(
+                f"SELECT article_id, source, source_name, url FROM sources WHERE article_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ):
+                sources.setdefault(article_id, []).append({'source': source, 'source_name': source_name, 'url': url})
+
+        articles = []
+        for (article_id, _, url, link_url, title, source, source_name, published_ts, description,
+             score, comments, relevance, summary, image, image_meta) in rows:
+            articles.append(Article(
+                source, source_name, title, url, published_ts,
+                description=description, image=image or '', link_url=link_url, score=score,
+                comments=comments, relevance=relevance, sources=sources.get(article_id),
+                summary=summary, image_meta=json.loads(image_meta) if image_meta else None,
+            ))
+        return articles
+
+    def get_articles(self, urls):
+        """Stored articles for the given URLs, as {canonical URL: Article}; unknown URLs are left out"""
+        keys = sorted({canonical_url(url) for url in urls})
+        rows = []
+        with self.lock:
+            for chunk in _chunks(keys):
+                rows += self.conn.execute(
+                    _SELECT + f" WHERE a.canonical_url IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            articles = self._rows_to_articles(rows)
+        return {row[1]: article for row, article in zip(rows, articles)}
+
+    def recent(self, limit=30, since_ts=None, source=None):
+        """Most recently published articles, optionally from one source or after a time"""
+        clauses, params = [], []
+        if since_ts is not None:
+            clauses.append("a.published_ts >= ?")
+            params.append(since_ts)
+        if source is not None:
+            clauses.append("a.source = ?")
+            params.append(source)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            rows = self.conn.execute(
+                _SELECT + where + " ORDER BY a.published_ts DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+            return self._rows_to_articles(rows)
+
+    def search(self, query, limit=20):
+        """Full-text search over title, description and summary, best matches first"""
+        with self.lock:
+            if self.fts:
+                rows = self.conn.execute(
+                    _SELECT + " JOIN articles_fts f ON f.rowid = a.id WHERE articles_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                    (query, limit)
+                ).fetchall()
+            else:
+                pattern = f"%{query}%"
+                rows = self.conn.execute(
+                    _SELECT + " WHERE a.title LIKE ? OR a.description LIKE ? OR s.summary LIKE ?"
+                              " ORDER BY a.published_ts DESC LIMIT ?",
+                    (pattern, pattern, pattern, limit)
+                ).fetchall()
+            return self._rows_to_articles(rows)
+
+    def add_episode(self, date, metadata):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO episodes (date, file, duration, metadata, created_at) VALUES (?, ?, ?, ?, ?)",
+                (date, metadata['file'], metadata.get('duration'), json.dumps(metadata), time.time())
+            )
+
+    def episodes(self, limit=30):
+        with self.lock:
+            rows = self.conn.execute("SELECT metadata FROM episodes ORDER BY date DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def export(self, path, articles):
+        """Write articles (e.g. from recent() or search()) as a news.json-shaped file"""
+        episodes = self.episodes(limit=1)
+        data = {'updated': datetime.datetime.now().isoformat(), 'articles': [a.to_dict() for a in articles]}
+        if episodes:
+            data['podcast'] = episodes[0]
+        write_atomic(path, encode(data))
+
+    def stats(self):
+        with self.lock:
+            return {
+                table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('articles', 'summaries', 'images', 'episodes')
+            }
+
+def _chunks(values, size=500):
+    """Split values for IN (...) lists, keeping under SQLite's bound-parameter limit"""
+    values = list(values)
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Query the article history store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    search = sub.add_parser('search', help="full-text search")
+    search.add_argument('query')
+    search.add_argument('--limit', type=int, default=20)
+    export = sub.add_parser('export', help="write recent articles as news.json")
+    export.add_argument('path')
+    export.add_argument('--limit', type=int, default=30)
+    export.add_argument('--source')
+    export.add_argument('--days', type=float, help="only articles published in the last N days")
+    args = parser.parse_args()
+
+    store = ArticleStore()
+    if args.command == 'search':
+        for article in store.search(args.query, args.limit):
+            print(f"{article.published[:10]}  {article.source_name or article.source}: {article.title}\n    {article.url}")
+    else:
+        since = time.time() - args.days * 86400 if args.days else None
+        articles = store.recent(args.limit, since_ts=since, source=args.source)
+        store.export(args.path, articles)
+        print(f"Exported {len(articles)} articles to {args.path}", file=sys.stderr)
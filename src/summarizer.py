@@ -1,79 +1,182 @@
-import os
-import time
-from groq import Groq
-from openai import OpenAI
+import json
+import hashlib
+import instrumentation
+import threading
+import llm_client
+from concurrency import bounded_map
+from summary_cache import SummaryCache, make_key
 
 SYSTEM_PROMPT = "You are a helpful assistant that summarizes tech news for a daily digest. Keep it concise (2-3 sentences), engaging, and focus on the key innovation or impact."
 
-def summarize_content(text, model_preference="groq", retries=3):
+GROQ_MODEL = llm_client.PROVIDERS["groq"].model
+OPENROUTER_MODEL = llm_client.PROVIDERS["openrouter"].model
+
+SUMMARY_UNAVAILABLE = "Summary unavailable."
+
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """ You will receive several articles, each introduced by an id in square brackets. Summarize each one independently and respond with JSON only, in the form {"summaries": [{"id": "<id>", "summary": "<summary>"}]}, with one entry per article."""
+
+# Output tokens budgeted per article summary
+SUMMARY_TOKENS = 150
+
+# Articles packed into a single batched request at most
+MAX_BATCH_SIZE = 10
+
+# Batched requests in flight at once
+BATCH_WORKERS = 3
+
+# Per-request token limits we stay under when packing batches
+PROVIDER_LIMITS = {
+    "groq": {"input_tokens": 6000, "output_tokens": 2048},
+    "openrouter": {"input_tokens": 8000, "output_tokens": 2048},
+}
+
+# Changes whenever the prompt or models change, invalidating cached summaries
+PROMPT_VERSION = hashlib.sha256(f"{SYSTEM_PROMPT}|{BATCH_SYSTEM_PROMPT}|{GROQ_MODEL}|{OPENROUTER_MODEL}".encode()).hexdigest()[:16]
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared persistent summary cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache()
+        return _cache
+
+def _summary_messages(text):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Summarize this:\n\n{text}"}
+    ]
+
+def summarize_content(text, model_preference="groq"):
     """
     Summarizes text using Groq (primary) or OpenRouter (fallback).
-    Retries on rate limit errors with exponential backoff.
+    Rate limits, retries and failover are handled by llm_client.
     """
-    # Try Groq first
-    if model_preference == "groq":
-        groq_api_key = os.environ.get("GROQ_API_KEY")
-        if groq_api_key:
-            for attempt in range(retries):
+    providers = llm_client.DEFAULT_ORDER if model_preference == "groq" else ("openrouter",)
+    summary = llm_client.chat(_summary_messages(text), providers=providers, max_tokens=SUMMARY_TOKENS)
+    return summary or SUMMARY_UNAVAILABLE
+
+def summarize_with_openrouter(text):
+    return summarize_content(text, model_preference="openrouter")
+
+def _estimate_tokens(text):
+    # ~4 characters per token is close enough for English prose
+    return len(text) // 4 + 1
+
+def _provider_limits():
+    provider = "groq" if llm_client.PROVIDERS["groq"].available() else "openrouter"
+    return PROVIDER_LIMITS[provider]
+
+def _make_batches(entries):
+    """Pack (id, text) entries into batches that fit the active provider's token limits"""
+    limits = _provider_limits()
+    input_budget = limits['input_tokens'] - _estimate_tokens(BATCH_SYSTEM_PROMPT)
+    max_items = min(MAX_BATCH_SIZE, limits['output_tokens'] // SUMMARY_TOKENS)
+
+    batches = []
+    current, current_tokens = [], 0
+    for entry in entries:
+        tokens = _estimate_tokens(entry[1]) + 16  # id and JSON framing
+        if current and (len(current) >= max_items or current_tokens + tokens > input_budget):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(entry)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def _parse_batch_response(content, ids):
+    """Extract {id: summary} from a batch response, keeping only well-formed entries"""
+    if not content:
+        return {}
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`")
+        if content.startswith("json"):
+            content = content[4:]
+    try:
+        data = json.loads(content)
+    except ValueError:
+        print("Batch response was not valid JSON")
+        return {}
+
+    results = {}
+    entries = data.get("summaries", []) if isinstance(data, dict) else []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        entry_id = str(entry.get("id", ""))
+        summary = entry.get("summary")
+        if entry_id in ids and isinstance(summary, str) and summary.strip():
+            results[entry_id] = summary.strip()
+    return results
+
+@instrumentation.timed('summarize.batch')
+def _summarize_batch(batch):
+    """
+    Summarize one batch of (id, text) entries in a single request.
+
+    Returns {id: summary} for the entries the response covered, or None
+    when no provider answered at all.
+    """
+    articles = "\n\n".join(f"[{entry_id}]\n{text}" for entry_id, text in batch)
+    messages = [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Summarize each of these {len(batch)} articles:\n\n{articles}"}
+    ]
+    max_tokens = SUMMARY_TOKENS * len(batch) + 50
+    content = llm_client.chat(messages, max_tokens=max_tokens, json_mode=True)
+    if not content:
+        return None
+    return _parse_batch_response(content, {entry_id for entry_id, _ in batch})
+
+def summarize_many(items):
+    """
+    Summarize many articles, packing several into each LLM request.
+
+    items is a list of (url, content_context) pairs; summaries are returned in
+    the same order. Cached summaries are reused, and articles missing from a
+    batch response fall back to a single-article request. Batches that
+    got no response at all are marked unavailable without retrying.
+    """
+    cache = get_cache()
+    keys = [make_key(url, text, PROMPT_VERSION) for url, text in items]
+    summaries = [cache.get(key) for key in keys]
+
+    pending = [(str(i), items[i][1]) for i, summary in enumerate(summaries) if summary is None]
+    batches = _make_batches(pending)
+    if pending:
+        print(f"Summarizing {len(pending)} articles in {len(batches)} batched requests "
+              f"({len(items) - len(pending)} cached)")
+
+    batch_results = bounded_map(_summarize_batch, batches, max_workers=BATCH_WORKERS)
+    for batch, results in zip(batches, batch_results):
+        if results is None:
+            # Nobody answered (providers down or rate limited); single requests would fare no better
+            print(f"No response for a batch of {len(batch)} articles")
+            instrumentation.incr('summarize.unanswered', len(batch))
+            for entry_id, _ in batch:
+                summaries[int(entry_id)] = SUMMARY_UNAVAILABLE
+            continue
+        for entry_id, text in batch:
+            i = int(entry_id)
+            summary = results.get(entry_id)
+            if summary is None:
+                print(f"No batch summary for article {i}, retrying individually")
+                instrumentation.incr('summarize.single_fallbacks')
                 try:
-                    client = Groq(api_key=groq_api_key)
-                    completion = client.chat.completions.create(
-                        model="llama-3.3-70b-versatile",
-                        messages=[
-                            {"role": "system", "content": SYSTEM_PROMPT},
-                            {"role": "user", "content": f"Summarize this:\n\n{text}"}
-                        ],
-                        temperature=0.5,
-                        max_tokens=150,
-                        top_p=1,
-                        stop=None,
-                        stream=False
-                    )
-                    return completion.choices[0].message.content
+                    with instrumentation.span('summarize.single'):
+                        summary = summarize_content(text)
                 except Exception as e:
-                    err = str(e).lower()
-                    if 'rate' in err or '429' in err or 'quota' in err:
-                        wait = 2 ** attempt  # 1s, 2s, 4s
-                        print(f"Groq rate limited (attempt {attempt+1}/{retries}), waiting {wait}s...")
-                        time.sleep(wait)
-                    else:
-                        print(f"Groq failed: {e}. Switching to OpenRouter...")
-                        break
-            else:
-                print("Groq rate limit exhausted, switching to OpenRouter...")
-        else:
-            print("GROQ_API_KEY not set, switching to OpenRouter...")
-
-    return summarize_with_openrouter(text)
-
-def summarize_with_openrouter(text, retries=2):
-    openrouter_api_key = os.environ.get("OPENROUTER_API_KEY")
-    if not openrouter_api_key:
-        print("OPENROUTER_API_KEY not set, no summary available.")
-        return "Summary unavailable."
-
-    for attempt in range(retries):
-        try:
-            client = OpenAI(
-                base_url="https://openrouter.ai/api/v1",
-                api_key=openrouter_api_key,
-            )
-            completion = client.chat.completions.create(
-                model="meta-llama/llama-3.1-8b-instruct:free",
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": f"Summarize this:\n\n{text}"}
-                ]
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            err = str(e).lower()
-            if ('rate' in err or '429' in err or 'quota' in err) and attempt < retries - 1:
-                wait = 2 ** attempt
-                print(f"OpenRouter rate limited (attempt {attempt+1}/{retries}), waiting {wait}s...")
-                time.sleep(wait)
-            else:
-                print(f"OpenRouter failed: {e}")
-                break
-
-    return "Summary unavailable."
+                    instrumentation.incr('errors.summarize')
+                    print(f"Failed to summarize article {i}: {e}")
+                    summary = SUMMARY_UNAVAILABLE
+            summaries[i] = summary
+            if summary and summary != SUMMARY_UNAVAILABLE:
+                cache.put(keys[i], items[i][0], summary)
+
+    return summaries
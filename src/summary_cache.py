@@ -0,0 +1,88 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent.parent / '.cache' / 'summaries.sqlite3'
+
+# Summaries unused for this long are dropped
+MAX_AGE = 30 * 24 * 3600
+
+# Upper bound on stored summaries; least recently used go first
+MAX_ENTRIES = 5000
+
+def make_key(url, content_context, version):
+    """Hash the article URL, the prompt context and the model/prompt version into a cache key"""
+    h = hashlib.sha256()
+    for part in (version, url or '', content_context):
+        h.update(part.encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+class SummaryCache:
+    """Persistent summary store backed by SQLite"""
+
+    def __init__(self, path=CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries (last_used)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached summary for key, or None"""
+        with self.lock:
+            row = self.conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            return row[0]
+
+    def put(self, key, url, summary):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, url, summary, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, url, summary, now, now)
+            )
+            self.conn.commit()
+
+    def prune(self, max_age=MAX_AGE, max_entries=MAX_ENTRIES):
+        """Drop entries unused for max_age seconds, then the least recently used beyond max_entries"""
+        with self.lock:
+            cur = self.conn.execute("DELETE FROM summaries WHERE last_used < ?", (time.time() - max_age,))
+            removed = cur.rowcount
+            cur = self.conn.execute("""
+                DELETE FROM summaries WHERE key IN (
+                    SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (max_entries,))
+            removed += cur.rowcount
+            self.conn.commit()
+        return removed
+
+    def stats(self):
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': size,
+        }
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'tts'
+
+# Total size of cached segments; least recently used are evicted beyond this
+MAX_BYTES = 100 * 1024 * 1024
+
+def make_key(voice, text, settings):
+    """Hash the voice, text and TTS settings that determine a segment's audio"""
+    h = hashlib.sha256()
+    for part in (voice, text, repr(sorted(settings.items()))):
+        h.update(part.encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+class TTSCache:
+    """Persistent store of synthesized segments, one MP3 file per key"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.directory / f"{key}.mp3"
+
+    def get(self, key):
+        """Return cached audio bytes for key, or None"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def prune(self, max_bytes=MAX_BYTES):
+        """Evict least recently used segments until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for path in self.directory.glob('*.mp3'):
+            st = path.stat()
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }